@@ -0,0 +1,50 @@
+'''Benchmark of the gregorian and islamic date conversions per date
+
+	Run from the repository root: python benchmarks/benchmark_calendar.py'''
+
+import sys
+import timeit
+from datetime import date, timedelta
+from os.path import abspath, dirname
+
+sys.path.insert(0, dirname(dirname(abspath(__file__))))
+
+import scripts
+import convertdate.gregorian as gregorian
+import convertdate.islamic as islamic
+import convertdate.ummalqura as ummalqura
+
+
+def benchmark(label, func, count, repeat=5):
+	'''Time the function and print its best cost per date'''
+	best = min(timeit.repeat(func, number=1, repeat=repeat))
+	print(f"{label:<45}{best / count * 1e6:10.3f} us/date")
+
+
+def main():
+	dates = [(d.year, d.month, d.day) for d in (date(2000, 1, 1) + timedelta(n) for n in range(36525))]
+	# Dates before the islamic lookup tables take the calculated path
+	old_dates = [(d.year, d.month, d.day) for d in (date(1700, 1, 1) + timedelta(n) for n in range(36525))]
+	ordinals = [gregorian.to_ordinal(*d) for d in dates]
+	islamic.from_gregorian(*dates[0])
+
+	benchmark("gregorian.to_jd", lambda: [gregorian.to_jd(*d) for d in dates], len(dates))
+	benchmark("gregorian.to_ordinal", lambda: [gregorian.to_ordinal(*d) for d in dates], len(dates))
+	benchmark("gregorian.from_jd", lambda: [gregorian.from_jd(o + gregorian.ORDINAL_EPOCH) for o in ordinals], len(dates))
+	benchmark("gregorian.from_ordinal", lambda: [gregorian.from_ordinal(o) for o in ordinals], len(dates))
+	benchmark("islamic.from_jd(gregorian.to_jd) (1700s)", lambda: [islamic.from_jd(gregorian.to_jd(*d)) for d in old_dates],
+			len(old_dates))
+	benchmark("islamic.from_gregorian (1700s)", lambda: [islamic.from_gregorian(*d) for d in old_dates], len(old_dates))
+	benchmark("islamic.from_gregorian (table)", lambda: [islamic.from_gregorian(*d) for d in dates], len(dates))
+	hijri_dates = [islamic.from_gregorian(*d) for d in old_dates]
+	benchmark("gregorian.from_jd(islamic.to_jd) (1100s)", lambda: [gregorian.from_jd(islamic.to_jd(*d)) for d in hijri_dates],
+			len(hijri_dates))
+	benchmark("islamic.to_gregorian (1100s)", lambda: [islamic.to_gregorian(*d) for d in hijri_dates], len(hijri_dates))
+	benchmark("ummalqura.from_gregorian", lambda: [ummalqura.from_gregorian(*d) for d in dates], len(dates))
+	umm_al_qura_dates = [ummalqura.from_gregorian(*d) for d in dates]
+	benchmark("ummalqura.to_gregorian", lambda: [ummalqura.to_gregorian(*d) for d in umm_al_qura_dates], len(dates))
+	benchmark("islamic.from_gregorian_array", lambda: islamic.from_gregorian_array(*zip(*dates)), len(dates))
+
+
+if __name__ == "__main__":
+	main()
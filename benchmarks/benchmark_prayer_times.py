@@ -0,0 +1,63 @@
+'''Benchmark of the prayer times calculation per day
+
+	Run from the repository root: python benchmarks/benchmark_prayer_times.py'''
+
+import sys
+import timeit
+from datetime import date, timedelta
+from os.path import abspath, dirname
+
+sys.path.insert(0, dirname(dirname(abspath(__file__))))
+
+import scripts
+from prayer_times import PrayerTimes
+
+
+def benchmark(label, func, days, repeat=5, setup=None):
+	'''Time the function and print its best cost per day'''
+	best = min(timeit.repeat(func, setup=setup or (lambda: None), number=1, repeat=repeat))
+	print(f"{label:<40}{best / days * 1e6:10.2f} us/day")
+
+
+def main():
+	prayer_times = PrayerTimes()
+	prayer_times.lat, prayer_times.lng, prayer_times.timezone = 33.6, 73.0, 5
+	start = date(2024, 1, 1)
+	dates = [start + timedelta(n) for n in range(366)]
+
+	def clear_caches():
+		prayer_times.day_cache.clear()
+		prayer_times.range_cache.clear()
+
+	def change_offset():
+		prayer_times.offset["fajr"] = "1 min" if prayer_times.offset["fajr"] != "1 min" else "2 min"
+
+	month = dates[:31]
+	benchmark("get_times (formatted)", lambda: [prayer_times.get_times(d) for d in dates], len(dates), setup=clear_caches)
+	benchmark("get_times after an offset change", lambda: [prayer_times.get_times(d) for d in month], len(month),
+			setup=change_offset)
+	jdates = [prayer_times.julian(d.year, d.month, d.day) - prayer_times.lng / 360.0 for d in dates]
+	benchmark("compute_prayer_times (raw astronomy)", lambda: [prayer_times.compute_prayer_times(jd, {
+		'imsak': 5, 'fajr': 5, 'sunrise': 6, 'dhuhr': 12,
+		'asr': 13, 'sunset': 18, 'maghrib': 18, 'isha': 18
+	}) for jd in jdates], len(dates))
+	benchmark("get_times_range", lambda: prayer_times.get_times_range(start, start + timedelta(366)), len(dates),
+			setup=clear_caches)
+	benchmark("get_times_range after an offset change", lambda: prayer_times.get_times_range(start, start + timedelta(366)),
+			len(dates), setup=change_offset)
+	table = prayer_times.get_times_range(start, start + timedelta(366))
+	benchmark("get_formatted_time over a range", lambda: [[prayer_times.get_formatted_time(time) for time in times]
+			for times in table.values()], len(dates))
+	benchmark("get_formatted_times_array over a range", lambda: [prayer_times.get_formatted_times_array(times)
+			for times in table.values()], len(dates))
+	benchmark("get_qibla_times", lambda: prayer_times.get_qibla_times(start, start + timedelta(366)), len(dates))
+
+	prayer_times.tolerance = 1.0
+	benchmark("get_times refined to 1 s", lambda: [prayer_times.get_times(d) for d in dates], len(dates), setup=clear_caches)
+	benchmark("get_times_range refined to 1 s", lambda: prayer_times.get_times_range(start, start + timedelta(366)),
+			len(dates), setup=clear_caches)
+	print(f"{'':<40}{prayer_times.iterations.mean():10.2f} passes per day")
+
+
+if __name__ == "__main__":
+	main()
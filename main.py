@@ -56,12 +56,12 @@ class MuhasibApp(App):
 		super().__init__(**kwargs)
 
 
+		# Initialize the database
+		self.database = Database(prayer_times_cache=True)
+
 		# Load the setting configuration setting its prayer time parameters
 		self.prayer_times = PrayerTimes()
 		self.load_settings()
-
-		# Initialize the database
-		self.database = Database()
 		self.create_database_day()
 
 		# Initializing all the screens and the screen manager
@@ -101,6 +101,24 @@ class MuhasibApp(App):
 		else:
 			return time.strftime("%I:%M %p")
 
+	def get_prayer_times(self, day, output="text"):
+		'''Get the prayer times of a date from the database cache, calculating its whole month if missing'''
+		fingerprint = self.prayer_times.get_config().fingerprint()
+		times = self.database.get_cached_prayer_times(fingerprint, day)
+
+		if times is None:
+			start = day.replace(day=1)
+			end = (start + timedelta(32)).replace(day=1)
+			table = self.prayer_times.range_table(start, end)
+			self.database.cache_prayer_times(fingerprint, start, table)
+			times = {name: float(time[day.day - 1]) for name, time in table.items()}
+
+		return self.prayer_times.format_times(times, day, output)
+
+	def clear_prayer_times_cache(self):
+		'''Remove the cached prayer times that no longer match the calculation settings'''
+		self.database.clear_prayer_times_cache(keep=self.prayer_times.get_config().fingerprint())
+
 	def set_prayer_times_settings(self):
 		'''Change the prayer times calculation settings according to app's settings'''
 		self.prayer_times.imsak_time = self.settings["imsak_time"]
@@ -123,6 +141,7 @@ class MuhasibApp(App):
 		self.prayer_times.lng = self.settings["longitude"]
 		self.prayer_times.alt = self.settings["altitude"]
 		self.prayer_times.timezone = utcoffset(self.settings["timezone"])
+		self.prayer_times.tz_name = self.settings["timezone"]
 
 	def change_location(self, location, lat, lng, alt, tz):
 		'''Change all the location data and modify prayer times appropriately'''
@@ -133,6 +152,7 @@ class MuhasibApp(App):
 		self.settings["altitude"] = alt
 		self.settings["timezone"] = tz
 		self.set_prayer_time_location()
+		self.clear_prayer_times_cache()
 
 		# Refresh the screen currently opened if required
 		if hasattr(self.screen_manager.current_screen, "refresh"):
@@ -156,14 +176,12 @@ class MuhasibApp(App):
 			return False
 
 	def load_settings(self):
-		'''Load the setttings configuration from the file and make the file if it doesn't exist'''
-		try:
-			with open("settings.json", "r") as json_file:
-				self.settings = json.load(json_file)
-		except FileNotFoundError:
-			self.settings = {
+		'''Load the setttings configuration from the file and make the file if it doesn't exist
+
+			Settings added after the file was written take their default values'''
+		default_settings = {
 							"latitude": 0, "longitude": 0, "altitude": 0,
-							"location": "", "calc_method": "Muslim World League",
+							"location": "", "timezone": "", "calc_method": "Muslim World League",
 							"asr_factor": "Standard", "time_format": "24h",
 							"imsak_time": "Show", "high_lats": "Night Middle",
 							"dhuhr_offset": "0 min", "imsak_offset": "10 min",
@@ -171,8 +189,14 @@ class MuhasibApp(App):
 							"dhuhr_adjustment": "0 min", "asr_adjustment": "0 min",
 							"maghrib_adjustment": "0 min", "isha_adjustment": "0 min",
 							"fasting_record": "Show in Ramazan", "quran_record": "Don't Show",
-							"hadees_record": "Don't Show", "hijri_adjustment": "0"
+							"hadees_record": "Don't Show", "hijri_adjustment": "0",
+							"hijri_calendar": "Tabular"
 							}
+		try:
+			with open("settings.json", "r") as json_file:
+				self.settings = {**default_settings, **json.load(json_file)}
+		except FileNotFoundError:
+			self.settings = default_settings
 			self.save_settings()
 
 	def display_settings(self, *args):
@@ -191,12 +215,20 @@ class MuhasibApp(App):
 	def on_settings(self, instance, value):
 		'''When config changes then upgrade prayer time configuration and save the settings'''
 		self.set_prayer_times_settings()
+		self.database.hijri_adjustment = int(self.settings["hijri_adjustment"])
+		self.database.hijri_calendar = self.settings["hijri_calendar"]
+		# The settings are first loaded before location_check sets the location, clearing
+		# the cache then would only keep the times of the placeholder location
+		if self.location_data_present():
+			self.set_prayer_time_location()
+			self.clear_prayer_times_cache()
 		self.save_settings()
 
 	def day_pass_check(self):
 		'''Check if a day has passed and upgrade the prayer times and records if it has'''
 		if self.today != date.today():
 			self.prayer_times.timezone = utcoffset(self.settings["timezone"])
+			self.clear_prayer_times_cache()
 			self.create_database_day()
 
 	def create_database_day(self):
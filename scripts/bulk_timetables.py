@@ -0,0 +1,125 @@
+'''Command line tool generating the yearly prayer timetables of every city in the locations table
+
+	Run from the repository root, for example:
+	python -m scripts.bulk_timetables 2025 --output timetables --format csv --workers 4
+
+	The cities are split into shards of --shard-size cities which are computed in
+	a process pool, each shard streaming its rows into its own file. A shard file is
+	written under a temporary name and renamed once complete, so running the same
+	command again after an interruption only computes the missing shards. The shard
+	files are named after a key of the calculation settings, the time format, the
+	shard size and the cities, so a run with different inputs never reuses them.'''
+
+import argparse
+import csv
+import hashlib
+import json
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import replace
+from datetime import date, timedelta
+from os.path import exists, join
+
+import numpy as np
+
+from constants import ASR_FACTORS, HIGH_LAT_METHODS, PRAYER_METHODS, TIME_FORMATS, TIME_NAMES
+from database import DATABASE_PATH, Database
+from prayer_times import PrayerTimes
+
+FORMATS = ("csv", "jsonl")
+
+
+def run_key(config, shard_size, cities):
+	'''Return a short hash of the inputs changing the contents of the shard files'''
+	inputs = (config.fingerprint(), config.time_format, config.time_suffixes, config.imsak_time, shard_size, cities)
+	return hashlib.sha1(repr(inputs).encode()).hexdigest()[:12]
+
+def shard_path(output, year, key, shard, file_format):
+	'''Return the path of the file of a shard'''
+	return join(output, f"timetables-{year}-{key}-{shard:05d}.{file_format}")
+
+def write_shard(config, cities, year, path, file_format):
+	'''Compute the year's timetable of every city of a shard and write it to the shard file'''
+	start, end = date(year, 1, 1), date(year + 1, 1, 1)
+	temporary_path = path + ".part"
+
+	with open(temporary_path, "w", newline="", encoding="utf-8") as shard_file:
+		writer = csv.writer(shard_file)
+		header = None
+		for city, region, country, lat, lng, alt, tz in cities:
+			prayer_times = PrayerTimes.from_config(replace(config, lat=lat, lng=lng, alt=alt or 0, tz_name=tz))
+			table = prayer_times.get_times_range(start, end)
+			names = [name for name in TIME_NAMES if name in table]
+			columns = [np.char.strip(prayer_times.get_formatted_times_array(table[name]).astype(str)) for name in names]
+
+			if file_format == "csv" and header is None:
+				header = ["city", "region", "country", "date", *names]
+				writer.writerow(header)
+			for day, times in enumerate(zip(*columns)):
+				day = (start + timedelta(day)).isoformat()
+				if file_format == "csv":
+					writer.writerow([city, region, country, day, *times])
+				else:
+					row = {"city": city, "region": region, "country": country, "date": day, "times": dict(zip(names, times))}
+					shard_file.write(json.dumps(row, ensure_ascii=False) + "\n")
+
+	os.replace(temporary_path, path)
+	return len(cities)
+
+def parse_arguments(args=None):
+	'''Parse the command line arguments'''
+	parser = argparse.ArgumentParser(description="Generate the yearly prayer timetables of all the cities in the locations table")
+	parser.add_argument("year", type=int, help="year of the timetables")
+	parser.add_argument("--output", default="timetables", help="directory of the shard files")
+	parser.add_argument("--format", choices=FORMATS, default="csv", help="format of the shard files")
+	parser.add_argument("--database", default=DATABASE_PATH, help="database holding the locations table")
+	parser.add_argument("--shard-size", type=int, default=100, help="number of cities in a shard")
+	parser.add_argument("--workers", type=int, default=None, help="number of worker processes")
+	parser.add_argument("--method", choices=PRAYER_METHODS, default="Muslim World League")
+	parser.add_argument("--asr-factor", choices=ASR_FACTORS, default="Standard")
+	parser.add_argument("--high-lats", choices=HIGH_LAT_METHODS, default="Night Middle")
+	parser.add_argument("--time-format", choices=TIME_FORMATS, default="24h")
+	parser.add_argument("--tolerance", type=float, default=None, help="refine the times until they are within this many seconds")
+	return parser.parse_args(args)
+
+def main(args=None):
+	'''Generate the timetable shards that are not written yet'''
+	args = parse_arguments(args)
+	os.makedirs(args.output, exist_ok=True)
+
+	prayer_times = PrayerTimes()
+	prayer_times.set_method(args.method)
+	prayer_times.asr_param = args.asr_factor
+	prayer_times.settings["high_lats"] = args.high_lats
+	prayer_times.time_format = args.time_format
+	prayer_times.tolerance = args.tolerance
+	config = prayer_times.get_config()
+
+	cities = Database(args.database).get_locations_data()
+	# Without a timezone the times would be written in UTC
+	skipped = [city for city in cities if not city[6]]
+	if skipped:
+		print(f"Skipping {len(skipped)} cities without a timezone: {'; '.join(', '.join(filter(None, city[:3])) for city in skipped)}",
+			file=sys.stderr)
+		cities = [city for city in cities if city[6]]
+	key = run_key(config, args.shard_size, cities)
+	shards = [cities[i:i + args.shard_size] for i in range(0, len(cities), args.shard_size)]
+	pending = {n: shard for n, shard in enumerate(shards)
+				if not exists(shard_path(args.output, args.year, key, n, args.format))}
+	done = len(cities) - sum(len(shard) for shard in pending.values())
+
+	print(f"{len(cities)} cities in {len(shards)} shards of run {key}, {len(shards) - len(pending)} already written",
+		file=sys.stderr)
+	with ProcessPoolExecutor(args.workers) as executor:
+		futures = [executor.submit(write_shard, config, shard, args.year,
+								shard_path(args.output, args.year, key, n, args.format), args.format)
+					for n, shard in pending.items()]
+		for future in as_completed(futures):
+			done += future.result()
+			print(f"\r{done}/{len(cities)} cities", end="", file=sys.stderr, flush=True)
+	print(file=sys.stderr)
+
+
+if __name__ == "__main__":
+	main()
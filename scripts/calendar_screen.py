@@ -11,9 +11,9 @@ from kivy.uix.gridlayout import GridLayout
 from kivy.uix.label import Label
 
 import constants
-import convertdate.islamic as islamic
 from custom_widgets import (BaseToggleButton, CustomModalView, CustomScreen,
 							CustomTextInput, TextButton)
+from islamic_events import CALENDARS, get_event_index
 
 MONTHS = ["January", "Feburary", "March", "April", "May", "June", "July",
 		"August", "September", "October", "November", "December"]
@@ -39,14 +39,20 @@ class CalendarScreen(CustomScreen):
 		'''Create the calendar screen and load the data required for function'''
 		self.cal.populate_func = self.populate_calendar
 		self.cal.date_widget = DateButton
-		self.hijri_adjustment = int(App.get_running_app().settings["hijri_adjustment"])
+		settings = App.get_running_app().settings
+		self.hijri_adjustment = int(settings["hijri_adjustment"])
+		self.hijri_calendar = CALENDARS[settings["hijri_calendar"]]
+		self.events = get_event_index(self.hijri_adjustment, settings["hijri_calendar"])
 		self.cal.create_calendar()
 
 	def set_hijri_date_text(self, date):
 		'''Find the current month's islamic equivalent and set the text to that range'''
 		gregorian = f"{date.day}-{MONTHS[date.month - 1]}-{date.year}"
-		hijri_year, hijri_month, hijri_day = islamic.from_gregorian(date.year, date.month, date.day, adj=self.hijri_adjustment)
+		hijri_year, hijri_month, hijri_day = self.hijri_calendar.from_gregorian(date.year, date.month, date.day, adj=self.hijri_adjustment)
 		hijri = f"{hijri_day}-{ISLAMIC_MONTHS[hijri_month - 1]}-{hijri_year}"
+		events = [event for event in self.events.events_on(date) if event != "Ramadan"]
+		if events:
+			hijri += f" ({', '.join(events)})"
 		self.date_text = gregorian + "\n" + hijri
 
 	def populate_calendar(self):
@@ -68,6 +74,8 @@ class CalendarScreen(CustomScreen):
 				# Color the button
 				if date == datetime.date.today():
 					bg_color = constants.WARNING_COLOR
+				elif self.events.events_on(date):
+					bg_color = constants.SECONDRY_COLOR
 				else:
 					bg_color = constants.MAIN_COLOR
 
@@ -11,6 +11,10 @@ PRAYER_CATEGORY_NAMES = ('Group', 'Alone', 'Delayed', 'Not Prayed')
 PRAYER_CATEGORY_COLORS = (SECONDRY_COLOR, TERNARY_COLOR, CAUTION_COLOR, WARNING_COLOR)
 CATEGORY_COLORS_DICT = {PRAYER_CATEGORY_NAMES[i]: PRAYER_CATEGORY_COLORS[i] for i in range(4)}
 PRAYER_NAMES = ("Fajr", "Dhuhr", "Asr", "Maghrib", "Isha")
+TIME_NAMES = ("imsak", "fajr", "sunrise", "dhuhr", "asr", "sunset", "maghrib", "isha", "midnight")
+
+KAABA_LAT = 21.423333
+KAABA_LNG = 39.823333
 
 NAVIGATION_DATA = (
 					{"text": "Main Screen", "icon": "data/back.png", "screen": "dashboard"},
@@ -40,6 +44,7 @@ OFFSET_MINUTES = tuple(f"{x} min" for x in range(61))
 FASTING_RECORD_OPTIONS = ("Show", "Show in Ramazan", "Don't Show")
 RECORD_OPTIONS = ("Show", "Don't Show")
 HIJRI_OPTIONS = ("-2", "-1", "0", "1", "2")
+HIJRI_CALENDARS = ("Tabular", "Umm al-Qura")
 
 SETTINGS_OPTIONS = {"calc_method": PRAYER_METHODS, "asr_factor": ASR_FACTORS,
 					"time_format": TIME_FORMATS, "high_lats": HIGH_LAT_METHODS,
@@ -49,4 +54,4 @@ SETTINGS_OPTIONS = {"calc_method": PRAYER_METHODS, "asr_factor": ASR_FACTORS,
 					"maghrib_adjustment": OFFSET_MINUTES, "isha_adjustment": OFFSET_MINUTES,
 					"fasting_record": FASTING_RECORD_OPTIONS, "quran_record": RECORD_OPTIONS,
 					"hadees_record": RECORD_OPTIONS, "imsak_time": RECORD_OPTIONS,
-					"hijri_adjustment": HIJRI_OPTIONS}
+					"hijri_adjustment": HIJRI_OPTIONS, "hijri_calendar": HIJRI_CALENDARS}
@@ -5,6 +5,9 @@
 # http://opensource.org/licenses/MIT
 # Copyright (c) 2016, fitnr <fitnr@fakeisthenewreal>
 from calendar import isleap, monthrange
+from datetime import MAXYEAR, MINYEAR, date
+
+import numpy as np
 
 from utils import floor, jwday, monthcalendarhelper
 
@@ -24,6 +27,10 @@ YEAR_DAYS = 365
 HAVE_30_DAYS = (4, 6, 9, 11)
 HAVE_31_DAYS = (1, 3, 5, 7, 8, 10, 12)
 
+# Julian day of day ordinal 0, the ordinals counting days like datetime.date.toordinal
+ORDINAL_EPOCH = EPOCH - 1
+MAX_ORDINAL = date.max.toordinal()
+
 
 def legal_date(year, month, day):
 	'''Check if this is a legal date in the Gregorian calendar'''
@@ -75,6 +82,68 @@ def to_jd(year, month, day):
 	)
 
 
+def to_ordinal(year, month, day):
+	'''Day ordinal of a Gregorian date, equal to to_jd(year, month, day) - ORDINAL_EPOCH
+
+	The date is validated once here, the ordinal is calculated in integers'''
+	if MINYEAR <= year <= MAXYEAR:
+		return date(year, month, day).toordinal()
+
+	legal_date(year, month, day)
+
+	if month <= 2:
+		leap_adj = 0
+	elif isleap(year):
+		leap_adj = -1
+	else:
+		leap_adj = -2
+
+	return (
+		(YEAR_DAYS * (year - 1)) +
+		(year - 1) // LEAP_CYCLE_YEARS -
+		(year - 1) // LEAP_SUPPRESSION_YEARS +
+		(year - 1) // INTERCALATION_CYCLE_YEARS +
+		((367 * month) - 362) // 12 + leap_adj + day
+	)
+
+
+def from_ordinal(ordinal):
+	'''Return the Gregorian date of a day ordinal in a (Y, M, D) tuple, equal to from_jd(ordinal + ORDINAL_EPOCH)'''
+	if 1 <= ordinal <= MAX_ORDINAL:
+		gregorian_date = date.fromordinal(ordinal)
+		return (gregorian_date.year, gregorian_date.month, gregorian_date.day)
+
+	quadricent, dqc = divmod(ordinal - 1, INTERCALATION_CYCLE_DAYS)
+	cent, dcent = divmod(dqc, LEAP_SUPPRESSION_DAYS)
+	quad, dquad = divmod(dcent, LEAP_CYCLE_DAYS)
+	yindex = dquad // YEAR_DAYS
+
+	year = (
+		quadricent * INTERCALATION_CYCLE_YEARS +
+		cent * LEAP_SUPPRESSION_YEARS +
+		quad * LEAP_CYCLE_YEARS + yindex
+	)
+
+	if not (cent == 4 or yindex == 4):
+		year += 1
+
+	yearday = ordinal - to_ordinal(year, 1, 1)
+
+	leap = isleap(year)
+
+	if yearday < 58 + leap:
+		leap_adj = 0
+	elif leap:
+		leap_adj = 1
+	else:
+		leap_adj = 2
+
+	month = (((yearday + leap_adj) * 12) + 373) // 367
+	day = ordinal - to_ordinal(year, month, 1) + 1
+
+	return (year, month, day)
+
+
 def from_jd(jd):
 	'''Return Gregorian date in a (Y, M, D) tuple'''
 	wjd = floor(jd - 0.5) + 0.5
@@ -116,6 +185,67 @@ def from_jd(jd):
 	return (year, month, day)
 
 
+def isleap_array(year):
+	'''Which years of an array are leap years'''
+	return (year % 4 == 0) & ((year % 100 != 0) | (year % 400 == 0))
+
+
+def legal_date_array(year, month, day):
+	'''Check if all the dates of arrays are legal dates in the Gregorian calendar'''
+	daysinmonth = np.where(month == 2, 28 + isleap_array(year), np.where(np.isin(month, HAVE_30_DAYS), 30, 31))
+	illegal = ~((0 < day) & (day <= daysinmonth))
+	if illegal.any():
+		i = np.argmax(illegal)
+		raise ValueError("Month {} doesn't have a day {}".format(np.ravel(month)[i], np.ravel(day)[i]))
+
+	return True
+
+
+def to_jd_array(year, month, day):
+	'''Julian Day Counts of arrays of Gregorian dates, equal to those of to_jd'''
+	year, month, day = np.broadcast_arrays(*(np.asarray(x, dtype=np.int64) for x in (year, month, day)))
+	legal_date_array(year, month, day)
+
+	leap_adj = np.where(month <= 2, 0, np.where(isleap_array(year), -1, -2))
+
+	return (
+		EPOCH - 1 + (YEAR_DAYS * (year - 1)) +
+		(year - 1) // LEAP_CYCLE_YEARS +
+		(-((year - 1) // LEAP_SUPPRESSION_YEARS)) +
+		(year - 1) // INTERCALATION_CYCLE_YEARS +
+		(((367 * month) - 362) // 12 + leap_adj + day)
+	)
+
+
+def from_jd_array(jd):
+	'''Return Gregorian dates of an array of Julian days as (Y, M, D) integer arrays, equal to those of from_jd'''
+	# Days since the epoch of the days starting at the julian days
+	depoch = np.floor(np.asarray(jd) - 0.5).astype(np.int64) - int(EPOCH - 0.5)
+
+	quadricent, dqc = np.divmod(depoch, INTERCALATION_CYCLE_DAYS)
+	cent, dcent = np.divmod(dqc, LEAP_SUPPRESSION_DAYS)
+	quad, dquad = np.divmod(dcent, LEAP_CYCLE_DAYS)
+	yindex = dquad // YEAR_DAYS
+
+	year = (
+		quadricent * INTERCALATION_CYCLE_YEARS +
+		cent * LEAP_SUPPRESSION_YEARS +
+		quad * LEAP_CYCLE_YEARS + yindex
+	)
+	year = np.where((cent == 4) | (yindex == 4), year, year + 1)
+
+	wjd = depoch + EPOCH
+	yearday = (wjd - to_jd_array(year, 1, 1)).astype(np.int64)
+
+	leap = isleap_array(year)
+	leap_adj = np.where(yearday < 58 + leap, 0, np.where(leap, 1, 2))
+
+	month = (((yearday + leap_adj) * 12) + 373) // 367
+	day = (wjd - to_jd_array(year, month, 1)).astype(np.int64) + 1
+
+	return (year, month, day)
+
+
 def month_length(year, month):
 	return monthrange(year, month)[1]
 
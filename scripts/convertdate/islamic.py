@@ -5,8 +5,12 @@
 # http://opensource.org/licenses/MIT
 # Copyright (c) 2016, fitnr <fitnr@fakeisthenewreal>
 
+from array import array
+from datetime import date
 from math import trunc
 
+import numpy as np
+
 import gregorian
 from utils import ceil, jwday, monthcalendarhelper
 
@@ -15,6 +19,19 @@ EPOCH = 1948439.5
 HAS_29_DAYS = (2, 4, 6, 8, 10)
 HAS_30_DAYS = (1, 3, 5, 7, 9, 11)
 
+# Gregorian years of the lookup tables, outside them the dates are calculated
+TABLE_YEARS = (1900, 2100)
+TABLE_START = date(TABLE_YEARS[0], 1, 1).toordinal()
+TABLE_END = date(TABLE_YEARS[1] + 1, 1, 1).toordinal()
+# Julian day of day ordinal 0
+ORDINAL_EPOCH = gregorian.ORDINAL_EPOCH
+
+# Islamic dates packed as year << 9 | month << 5 | day for every day of the table years,
+# and the day ordinals of the first days of the Islamic months overlapping them (see _tables)
+_day_table = None
+_month_table = None
+_first_month = None
+
 
 def leap(year):
 	'''Is a given year a leap year in the Islamic calendar'''
@@ -26,6 +43,11 @@ def to_jd(year, month, day, adj=0):
 	return (day + ceil(29.5 * (month - 1)) + (year - 1) * 354 + trunc((3 + (11 * year)) / 30) + EPOCH) - 1 + adj
 
 
+def to_ordinal(year, month, day, adj=0):
+	'''Day ordinal of an Islamic date, equal to to_jd(year, month, day, adj) - ORDINAL_EPOCH'''
+	return day + ceil(29.5 * (month - 1)) + (year - 1) * 354 + trunc((3 + (11 * year)) / 30) + int(EPOCH - ORDINAL_EPOCH) - 1 + adj
+
+
 def from_jd(jd, adj=0):
 	'''Calculate Islamic date from Julian day'''
 
@@ -36,12 +58,78 @@ def from_jd(jd, adj=0):
 	return (year, month, day)
 
 
+def to_jd_array(year, month, day, adj=0):
+	'''Julian Day Counts of arrays of Islamic dates, equal to those of to_jd'''
+	year, month, day = (np.asarray(x, dtype=np.int64) for x in (year, month, day))
+	# ceil(29.5 * (month - 1)) and trunc((3 + 11 * year) / 30) in integers
+	month_days = -((-59 * (month - 1)) // 2)
+	leap_days = np.fix((3 + (11 * year)) / 30).astype(np.int64)
+	return (day + month_days + (year - 1) * 354 + leap_days + EPOCH) - 1 + np.asarray(adj)
+
+
+def from_jd_array(jd, adj=0):
+	'''Calculate Islamic dates of an array of Julian days as (Y, M, D) integer arrays, equal to those of from_jd'''
+	jd = np.trunc(jd) + 0.5
+	year = np.trunc(((30 * (jd - EPOCH)) + 10646) / 10631).astype(np.int64)
+	month = np.minimum(12, np.ceil((jd - (29 + to_jd_array(year, 1, 1, adj=adj))) / 29.5).astype(np.int64) + 1)
+	day = (jd - to_jd_array(year, month, 1, adj=adj)).astype(np.int64) + 1
+	return (year, month, day)
+
+
+def from_gregorian_array(year, month, day, adj=0):
+	'''Convert arrays of Gregorian dates into Islamic dates as (Y, M, D) integer arrays'''
+	return from_jd_array(gregorian.to_jd_array(year, month, day), adj=adj)
+
+
+def to_gregorian_array(year, month, day, adj=0):
+	'''Convert arrays of Islamic dates into Gregorian dates as (Y, M, D) integer arrays'''
+	return gregorian.from_jd_array(to_jd_array(year, month, day, adj=adj))
+
+
+def _tables():
+	'''Build the lookup tables on first use by walking the Islamic months over the table years'''
+	global _day_table, _month_table, _first_month
+
+	if _day_table is None:
+		year, month, day = from_jd(TABLE_START + ORDINAL_EPOCH)
+		first_month = (year - 1) * 12 + month - 1
+		month_table = array('l', [TABLE_START - day + 1])
+		day_table = array('L')
+		while len(day_table) < TABLE_END - TABLE_START:
+			day_table.append(year << 9 | month << 5 | day)
+			day += 1
+			if day > month_length(year, month):
+				year, month, day = (year + 1, 1, 1) if month == 12 else (year, month + 1, 1)
+				month_table.append(TABLE_START + len(day_table))
+		_day_table, _month_table, _first_month = day_table, month_table, first_month
+
+	return _day_table, _month_table, _first_month
+
+
 def from_gregorian(year, month, day, adj=0):
-	return from_jd(gregorian.to_jd(year, month, day), adj=adj)
+	'''Convert a Gregorian date into an Islamic date, looked up in a table within TABLE_YEARS'''
+	if TABLE_YEARS[0] <= year <= TABLE_YEARS[1] and 1 <= month <= 12:
+		day_table = _tables()[0]
+		index = gregorian.to_ordinal(year, month, day) - TABLE_START
+		if 0 <= index - adj < len(day_table):
+			# from_jd estimates the year before adjusting, so the adjusted date is the date adj days
+			# earlier only when both fall in the same estimated year
+			packed = day_table[index - adj]
+			if packed >> 9 == day_table[index] >> 9:
+				return (packed >> 9, packed >> 5 & 15, packed & 31)
+
+	return from_jd(gregorian.to_ordinal(year, month, day) + ORDINAL_EPOCH, adj=adj)
 
 
 def to_gregorian(year, month, day, adj=0):
-	return gregorian.from_jd(to_jd(year, month, day, adj=adj))
+	'''Convert an Islamic date into a Gregorian date, looked up in a table within TABLE_YEARS'''
+	if 1 <= month <= 12:
+		_, month_table, first_month = _tables()
+		index = (year - 1) * 12 + month - 1 - first_month
+		if 0 <= index < len(month_table):
+			return gregorian.from_ordinal(month_table[index] + day - 1 + adj)
+
+	return gregorian.from_ordinal(to_ordinal(year, month, day, adj=adj))
 
 
 def month_length(year, month):
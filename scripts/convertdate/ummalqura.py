@@ -0,0 +1,119 @@
+# Umm al-Qura calendar of Saudi Arabia, looked up in a packed table of its month lengths
+
+# The month lengths are derived from the month starts of hijri-converter 2.3.1.
+# https://github.com/dralshehri/hijri-converter
+
+# Licensed under the MIT license:
+# http://opensource.org/licenses/MIT
+# Copyright (c) 2018 Mohammed Alshehri
+
+from array import array
+from bisect import bisect_right
+from math import trunc
+
+import gregorian
+import islamic
+from utils import jwday, monthcalendarhelper
+
+# Islamic years of the table, outside them the dates are those of the arithmetic islamic calendar
+# shifted to meet the table (see _fallback_shift)
+# The table starts after the last month of the published calendar not lasting 29 or 30 days
+TABLE_YEARS = (1365, 1500)
+
+# Day ordinal of 1 Muharram of the first year (5 December 1945)
+FIRST_DAY = 710370
+
+# One bit per month from Muharram of the first year, least significant bit of each
+# byte first, set when the month has 30 days and clear when it has 29
+MONTH_LENGTHS = bytes.fromhex(
+	"555d555555d5d55655a5aed2aa5acd552657a95d55aa5a552dd5a65a55554d37d5546d55555d2d554dd5455d652dd5a5"
+	"5a55adaab6d42a75a5ae64976c55b5aa5aa5add495da925db24dba4a5ba5b552576a2bbdc49bb895da52ada5b6d496dc"
+	"926daa56e92a6da53655abaa4dd9495da92bb5a55a55ada92ee9265da5add4566a4b75a94ee5aaac95ba925db24bb6ca"
+	"5a55b5d256ea4a5ea92dd5aa6c9375d256692db5a5baa49bb493b6526baab6d496ec926db24ed52a6da5aed4966a4db5"
+	"293ba92b75a53655abaa36e9"
+)
+
+# Day ordinals of the first days of the months and the day after the last month (see _month_starts)
+_starts = None
+
+
+def _month_starts():
+	'''Build the day ordinals of the month starts on first use, the prefix sums of the month lengths'''
+	global _starts
+
+	if _starts is None:
+		starts = array('l', [FIRST_DAY])
+		for index in range((TABLE_YEARS[1] - TABLE_YEARS[0] + 1) * 12):
+			starts.append(starts[-1] + 29 + (MONTH_LENGTHS[index >> 3] >> (index & 7) & 1))
+		_starts = starts
+
+	return _starts
+
+
+def _fallback_shift(before):
+	'''Days added to the arithmetic calendar before or after the table so that its months meet those of the table'''
+	starts = _month_starts()
+	if before:
+		return starts[0] - islamic.to_ordinal(TABLE_YEARS[0], 1, 1)
+	return starts[-1] - islamic.to_ordinal(TABLE_YEARS[1] + 1, 1, 1)
+
+
+def _month_index(year, month):
+	'''Position of a month in the table, None if it is outside the table'''
+	if TABLE_YEARS[0] <= year <= TABLE_YEARS[1] and 1 <= month <= 12:
+		return (year - TABLE_YEARS[0]) * 12 + month - 1
+	return None
+
+
+def to_ordinal(year, month, day, adj=0):
+	'''Day ordinal of an Umm al-Qura date'''
+	index = _month_index(year, month)
+	if index is None:
+		return islamic.to_ordinal(year, month, day) + _fallback_shift(year < TABLE_YEARS[0]) + adj
+
+	return _month_starts()[index] + day - 1 + adj
+
+
+def to_jd(year, month, day, adj=0):
+	'''Determine Julian day count from Umm al-Qura date'''
+	return to_ordinal(year, month, day, adj=adj) + gregorian.ORDINAL_EPOCH
+
+
+def from_ordinal(ordinal, adj=0):
+	'''Calculate Umm al-Qura date from a day ordinal'''
+	starts = _month_starts()
+	if not starts[0] <= ordinal - adj < starts[-1]:
+		shift = _fallback_shift(ordinal - adj < starts[0])
+		return islamic.from_jd(ordinal - adj - shift + gregorian.ORDINAL_EPOCH)
+
+	index = bisect_right(starts, ordinal - adj) - 1
+	year, month = divmod(index, 12)
+	return (TABLE_YEARS[0] + year, month + 1, ordinal - adj - starts[index] + 1)
+
+
+def from_jd(jd, adj=0):
+	'''Calculate Umm al-Qura date from Julian day'''
+	# The day of the julian day like islamic.from_jd
+	return from_ordinal(int(trunc(jd) + 0.5 - gregorian.ORDINAL_EPOCH), adj=adj)
+
+
+def from_gregorian(year, month, day, adj=0):
+	return from_ordinal(gregorian.to_ordinal(year, month, day), adj=adj)
+
+
+def to_gregorian(year, month, day, adj=0):
+	return gregorian.from_ordinal(to_ordinal(year, month, day, adj=adj))
+
+
+def month_length(year, month):
+	index = _month_index(year, month)
+	if index is None:
+		return islamic.month_length(year, month)
+
+	return 29 + (MONTH_LENGTHS[index >> 3] >> (index & 7) & 1)
+
+
+def monthcalendar(year, month, adj=0):
+	start_weekday = jwday(to_jd(year, month, 1, adj=adj))
+	monthlen = month_length(year, month)
+	return monthcalendarhelper(start_weekday, monthlen)
@@ -1,15 +1,33 @@
+import math
 import sqlite3
 from os.path import join
 from datetime import date, timedelta
 
-import convertdate.islamic as islamic
+from constants import TIME_NAMES
 from helpers import daterange
+from islamic_events import get_event_index
+
+DATABASE_PATH = join("data", "muhasib.sqlite")
 
 class Database():
 	'''Class to handle all the database related functionality'''
 
-	def __init__(self):
-		self.db = sqlite3.connect(join("data", "muhasib.sqlite"), detect_types=sqlite3.PARSE_DECLTYPES)
+	def __init__(self, path=DATABASE_PATH, hijri_adjustment=0, hijri_calendar="Tabular", prayer_times_cache=False):
+		self.db = sqlite3.connect(path, detect_types=sqlite3.PARSE_DECLTYPES)
+		self.hijri_adjustment = hijri_adjustment
+		self.hijri_calendar = hijri_calendar
+		# Only the app caches prayer times, tools reading the database leave it unchanged
+		if prayer_times_cache:
+			self.create_prayer_times_cache()
+
+	def create_prayer_times_cache(self):
+		'''Create the table caching calculated prayer times if it doesn't exist'''
+		cursor = self.db.cursor()
+		cursor.execute(f'''CREATE TABLE IF NOT EXISTS prayer_times_cache(
+							fingerprint TEXT NOT NULL, date DATE NOT NULL,
+							{", ".join(f"{name} REAL" for name in TIME_NAMES)},
+							PRIMARY KEY (fingerprint, date))''')
+		self.db.commit()
 
 	def create_record(self, date):
 		'''Create a record of this date'''
@@ -18,7 +36,7 @@ class Database():
 		if not self.get_record(date):
 			cursor = self.db.cursor()
 			# Check for ramazan
-			if islamic.from_gregorian(date.year, date.month, date.day)[1] == 9:
+			if get_event_index(self.hijri_adjustment, self.hijri_calendar).contains("Ramadan", date):
 				fast_required = True
 			else:
 				fast_required = False
@@ -56,6 +74,31 @@ class Database():
 		cursor.execute("SELECT fajr, dhuhr, asr, maghrib, isha FROM record WHERE date >= ? AND date <= ? ", (date, max_date))
 		return cursor.fetchall()
 
+	def get_cached_prayer_times(self, fingerprint, date):
+		'''Get the cached prayer times in hours of the date for the calculation settings fingerprint'''
+		cursor = self.db.cursor()
+		cursor.execute(f"SELECT {', '.join(TIME_NAMES)} FROM prayer_times_cache WHERE fingerprint = ? AND date = ?",
+						(fingerprint, date))
+		times = cursor.fetchone()
+		if times is None:
+			return None
+		return {name: float("nan") if time is None else time for name, time in zip(TIME_NAMES, times)}
+
+	def cache_prayer_times(self, fingerprint, start, table):
+		'''Store a column-oriented table of prayer times in hours for the days following the start date'''
+		columns = [[None if math.isnan(time) else time for time in table[name]] for name in TIME_NAMES]
+		rows = [(fingerprint, start + timedelta(n), *times) for n, times in enumerate(zip(*columns))]
+
+		cursor = self.db.cursor()
+		cursor.executemany(f"INSERT OR REPLACE INTO prayer_times_cache VALUES(?, ?, {', '.join('?' * len(TIME_NAMES))})", rows)
+		self.db.commit()
+
+	def clear_prayer_times_cache(self, keep=None):
+		'''Remove the cached prayer times of all calculation settings except the fingerprint to keep'''
+		cursor = self.db.cursor()
+		cursor.execute("DELETE FROM prayer_times_cache WHERE fingerprint IS NOT ?", (keep,))
+		self.db.commit()
+
 	def get_locations_data(self):
 		'''Get all the locations data from the locations table'''
 		cursor = self.db.cursor()
@@ -4,9 +4,12 @@ import datetime
 import math
 from os.path import join
 
+import numpy as np
 from plyer import notification
 from plyer.utils import platform
-from pytz import timezone
+
+from constants import KAABA_LAT, KAABA_LNG
+from timezones import get_timezone_table
 
 # Earth's parameters as a sphere according to WGS-84
 # https://en.wikipedia.org/wiki/World_Geodetic_System#WGS84
@@ -92,6 +95,72 @@ def vincenty_distance(lat1, lon1, lat2, lon2):
 
 	return POLES_RADIUS * A * (angular_sep - delta_angular_sep)
 
+def vincenty_distance_array(lat1, lon1, lat2, lon2):
+	'''Calculate the distances between arrays of points using vincenty's formula, NaN where it fails to converge'''
+
+	# Convert all angles to radians
+	lat1, lon1, lat2, lon2 = (np.radians(x) for x in np.broadcast_arrays(*(np.asarray(x, dtype=float) for x in (lat1, lon1, lat2, lon2))))
+	shape = lat1.shape
+
+	# Pre-calculate the trigonometric values so that the calculations are not repeated
+	tanlat1 = (1 - FLATTENING) * np.tan(lat1)
+	coslat1 = 1 / np.sqrt(1 + tanlat1**2)
+	sinlat1 = tanlat1 * coslat1
+	tanlat2 = (1 - FLATTENING) * np.tan(lat2)
+	coslat2 = 1 / np.sqrt(1 + tanlat2**2)
+	sinlat2 = tanlat2 * coslat2
+
+	# Difference between longitudes
+	original_lon = lon2 - lon1
+
+	lon = original_lon.ravel().copy()
+	original_lon, coslat1, sinlat1, coslat2, sinlat2 = (x.ravel() for x in (original_lon, coslat1, sinlat1, coslat2, sinlat2))
+	# The values of the iteration in which each pair of points converged
+	values = [np.zeros(lon.shape) for _ in range(5)]
+	converged = np.zeros(lon.shape, dtype=bool)
+	pending = np.arange(lon.size)
+
+	with np.errstate(divide="ignore", invalid="ignore"):
+		for _ in range(100):
+			# Only the pairs of points that have not converged yet are iterated again
+			sinlon = np.sin(lon[pending])
+			coslon = np.cos(lon[pending])
+			c1, s1, c2, s2 = coslat1[pending], sinlat1[pending], coslat2[pending], sinlat2[pending]
+			angular_sep_sin = np.sqrt(((c2 * sinlon) ** 2) + ((c1 * s2 - s1 * c2 * coslon) ** 2))
+			angular_sep_cos = s1 * s2 + c1 * c2 * coslon
+			angular_sep = np.arctan2(angular_sep_sin, angular_sep_cos)
+			azimuth_sin = np.where(angular_sep_sin == 0, 0, c1 * c2 * sinlon / angular_sep_sin)
+			cos_sqr_azimuth = 1 - (azimuth_sin ** 2)
+			# equatorial line: cos_sqr_azimuth = 0
+			cos_angular_mid_sep = np.where(cos_sqr_azimuth != 0, angular_sep_cos - 2 * s1 * s2 / cos_sqr_azimuth, 0)
+			C = FLATTENING / 16 * cos_sqr_azimuth * (4 + FLATTENING * (4 - 3 * cos_sqr_azimuth))
+			new_lon = original_lon[pending] + (1 - C) * FLATTENING * azimuth_sin * (angular_sep + C * angular_sep_sin * (cos_angular_mid_sep + C * angular_sep_cos * (-1 + 2 * (cos_angular_mid_sep) ** 2)))
+
+			for value, new in zip(values, (angular_sep_sin, angular_sep_cos, angular_sep, cos_sqr_azimuth, cos_angular_mid_sep)):
+				value[pending] = new
+			# co-incident points have converged too
+			done = (np.abs(new_lon - lon[pending]) <= 1e-12) | (angular_sep_sin == 0)
+			converged[pending[done]] = True
+			lon[pending] = new_lon
+			pending = pending[~done]
+			if not pending.size:
+				break
+
+	angular_sep_sin, angular_sep_cos, angular_sep, cos_sqr_azimuth, cos_angular_mid_sep = (x.reshape(shape) for x in values)
+	converged = converged.reshape(shape)
+	u_sqr = cos_sqr_azimuth * ((EQUATOR_RADIUS ** 2) - (POLES_RADIUS ** 2)) / (POLES_RADIUS ** 2)
+	A = 1 + u_sqr/16384 * (4096 + u_sqr * (-768 + u_sqr * (320 - 175 * u_sqr)))
+	B = u_sqr / 1024 * (256 + u_sqr * (-128 + u_sqr * (74 - 47 * u_sqr)))
+	delta_angular_sep = B * angular_sep_sin * (cos_angular_mid_sep + B / 4 * (angular_sep_cos * (-1 + 2 * (cos_angular_mid_sep ** 2)) \
+				- B / 6 * cos_angular_mid_sep * (-3 + 4 * (angular_sep_sin ** 2)) * (-3 + 4 * (cos_angular_mid_sep ** 2))))
+
+	distance = np.where(angular_sep_sin == 0, 0, POLES_RADIUS * A * (angular_sep - delta_angular_sep))
+	return np.where(converged, distance, np.nan)
+
+def kaaba_distance_array(lat, lng):
+	'''Calculate the distances in meters from arrays of positions to the Kaaba'''
+	return vincenty_distance_array(lat, lng, KAABA_LAT, KAABA_LNG)
+
 def _check_type(s):
 	'''Check if the given parameter is a string'''
 	if not isinstance(s, str):
@@ -108,11 +177,16 @@ def is_even(num):
 		return False
 	return True
 
-def utcoffset(tz):
-	'''Take the timezone name and return its UTC offset'''
-	now = datetime.datetime.now(tz=timezone(tz))
-	utc_offset = (now.utcoffset().days * 24) + (now.utcoffset().seconds / 3600)
-	return utc_offset
+def round_minute(time):
+	'''Round a datetime to the nearest minute'''
+	return (time + datetime.timedelta(seconds=30)).replace(second=0, microsecond=0)
+
+def utcoffset(tz, day=None):
+	'''Take the timezone name and return its UTC offset now, or on the given date'''
+	table = get_timezone_table(tz)
+	if day is None:
+		return table.utcoffset_at(datetime.datetime.now().timestamp())
+	return table.utcoffset(day)
 
 '''
 Jellyfish jaro-winkler algorithm copyright
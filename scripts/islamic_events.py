@@ -0,0 +1,99 @@
+'''Module for looking up the Islamic events, like Ramadan and the Eids, falling on gregorian dates'''
+
+from bisect import bisect_right
+from datetime import date
+from functools import lru_cache
+
+import convertdate.islamic as islamic
+import convertdate.ummalqura as ummalqura
+from constants import HIJRI_CALENDARS
+
+# Conversion module of every hijri calendar setting
+CALENDARS = dict(zip(HIJRI_CALENDARS, (islamic, ummalqura)))
+
+# Name, islamic months, first and last day in each month of every event
+# The last day is clipped to the length of the month
+ISLAMIC_EVENTS = (
+	("Islamic New Year", (1,), 1, 1),
+	("Ashura", (1,), 10, 10),
+	("Isra and Mi'raj", (7,), 27, 27),
+	("Mid-Sha'ban", (8,), 15, 15),
+	("Ramadan", (9,), 1, 30),
+	("Laylat al-Qadr", (9,), 27, 27),
+	("Eid al-Fitr", (10,), 1, 1),
+	("Day of Arafah", (12,), 9, 9),
+	("Eid al-Adha", (12,), 10, 10),
+	("Days of Tashreeq", (12,), 11, 13),
+	("White Days", tuple(range(1, 13)), 13, 15),
+)
+
+
+class IslamicEventIndex():
+	'''Gregorian intervals of the Islamic events of every islamic year, for a hijri adjustment and calendar
+
+		The intervals of the islamic years overlapping islamic.TABLE_YEARS are computed
+		once and more years are added when a date outside them is looked up. Every event
+		keeps its own sorted intervals, so checking a date is a binary search per event'''
+
+	def __init__(self, adj=0, calendar=HIJRI_CALENDARS[0]):
+		self.adj = adj
+		self.calendar = CALENDARS[calendar]
+		# (name, first ordinal, last ordinal) events of every islamic year
+		self.years = {}
+		self.starts = {}
+		self.ends = {}
+		self.first_ordinal = self.last_ordinal = None
+		self.cover(islamic.TABLE_START, islamic.TABLE_END - 1)
+
+	def year_intervals(self, year):
+		'''Compute the (name, first ordinal, last ordinal) events of an islamic year'''
+		intervals = []
+		for name, months, first_day, last_day in ISLAMIC_EVENTS:
+			for month in months:
+				start = self.calendar.to_ordinal(year, month, 1, adj=self.adj)
+				end_day = min(last_day, self.calendar.month_length(year, month))
+				intervals.append((name, start + first_day - 1, start + end_day - 1))
+		return intervals
+
+	def cover(self, first_ordinal, last_ordinal):
+		'''Add the islamic years overlapping the day ordinals and rebuild the intervals of the events'''
+		# The islamic years overlapping the days, and one more on each side to cover the adjustment
+		first_year = self.calendar.from_jd(first_ordinal + islamic.ORDINAL_EPOCH)[0] - 1
+		last_year = self.calendar.from_jd(last_ordinal + islamic.ORDINAL_EPOCH)[0] + 1
+		for year in range(first_year, last_year + 1):
+			if year not in self.years:
+				self.years[year] = self.year_intervals(year)
+
+		self.starts = {name: [] for name, *_ in ISLAMIC_EVENTS}
+		self.ends = {name: [] for name, *_ in ISLAMIC_EVENTS}
+		for year in sorted(self.years):
+			for name, start, end in self.years[year]:
+				self.starts[name].append(start)
+				self.ends[name].append(end)
+
+		self.first_ordinal = self.calendar.to_ordinal(first_year, 1, 1, adj=self.adj)
+		self.last_ordinal = self.calendar.to_ordinal(last_year + 1, 1, 1, adj=self.adj) - 1
+
+	def contains(self, name, day):
+		'''Check if an event falls on a date'''
+		ordinal = day.toordinal()
+		if not self.first_ordinal <= ordinal <= self.last_ordinal:
+			self.cover(min(ordinal, self.first_ordinal), max(ordinal, self.last_ordinal))
+
+		i = bisect_right(self.starts[name], ordinal) - 1
+		return i >= 0 and ordinal <= self.ends[name][i]
+
+	def events_on(self, day):
+		'''Return the names of the events falling on a date'''
+		return [name for name in self.starts if self.contains(name, day)]
+
+	def events_of_year(self, year):
+		'''Return the (name, first date, last date) events of an islamic year in gregorian dates'''
+		intervals = self.years[year] if year in self.years else self.year_intervals(year)
+		return [(name, date.fromordinal(start), date.fromordinal(end)) for name, start, end in intervals]
+
+
+@lru_cache(maxsize=None)
+def get_event_index(adj=0, calendar=HIJRI_CALENDARS[0]):
+	'''Return the shared event index of a hijri adjustment and calendar'''
+	return IslamicEventIndex(adj, calendar)
@@ -0,0 +1,181 @@
+'''Command line tool fitting a custom calculation method to a published prayer timetable
+
+	Run from the repository root, for example:
+	python -m scripts.method_fit timetable.csv --lat 31.55 --lng 74.34 --tz Asia/Karachi
+
+	The timetable is a CSV file with a date column (YYYY-MM-DD) and a column of times
+	(24h "HH:MM" or 12h "h:mm am") for any of the prayer times. The sun positions of
+	every day are computed once and all the candidate fajr and isha angles, asr factors
+	and high latitude rules are evaluated on them as arrays. The per prayer offsets are
+	the median differences left over, which minimise the absolute error of each prayer.'''
+
+import argparse
+import csv
+import json
+import sys
+from datetime import date
+
+import numpy as np
+
+from constants import ASR_FACTORS, HIGH_LAT_METHODS, TIME_NAMES
+from prayer_times import INITIAL_TIMES, PrayerTimes
+from timezones import get_timezone_table
+
+FITTED_NAMES = ("fajr", "sunrise", "dhuhr", "asr", "maghrib", "isha")
+
+# Default candidate fajr and isha angles
+ANGLES = "12:21:0.25"
+
+
+def parse_time(text):
+	'''Convert a published "HH:MM" or "h:mm am" time into float hours, NaN if it is missing'''
+	text = text.strip().lower()
+	if not text or text.startswith("-"):
+		return np.nan
+	clock, _, suffix = text.partition(" ")
+	hours, minutes = (int(x) for x in clock.split(":")[:2])
+	if suffix in ("am", "pm"):
+		hours = hours % 12 + (12 if suffix == "pm" else 0)
+	return hours + minutes / 60.0
+
+def read_timetable(path):
+	'''Read a published timetable into its dates and a column of float hours for every time name'''
+	with open(path, newline="", encoding="utf-8") as timetable_file:
+		rows = list(csv.DictReader(timetable_file))
+	dates = [date.fromisoformat(row["date"]) for row in rows]
+	names = [name for name in FITTED_NAMES if rows and name in rows[0]]
+	return dates, {name: np.array([parse_time(row[name]) for row in rows]) for name in names}
+
+def parse_grid(text):
+	'''Convert a "start:stop:step" argument into an inclusive array of values'''
+	start, stop, step = (float(x) for x in text.split(":"))
+	return np.round(np.arange(start, stop + step / 2, step), 6)
+
+def score(published, candidates):
+	'''Return the offsets in minutes and the mean absolute errors in minutes of candidate time arrays
+
+		The candidates are arrays of hours with the days on the last axis. A candidate missing
+		a time that was published can not be used and has an infinite error'''
+	with np.errstate(invalid="ignore"):
+		residuals = (published - candidates + 12) % 24 * 60 - 720
+	missing = np.isnan(candidates) & ~np.isnan(published)
+	residuals = np.where(np.isnan(published), np.nan, residuals)
+	offsets = np.round(np.nanmedian(residuals, axis=-1))
+	errors = np.nanmean(np.abs(residuals - offsets[..., None]), axis=-1)
+	return offsets, np.where(missing.any(axis=-1), np.inf, errors)
+
+def fit_method(dates, published, lat, lng, alt = 0, timezone = 0, tz_name = None, fajr_angles = None, isha_angles = None):
+	'''Find the calculation settings and offsets closest to a published timetable
+
+		Returns a dict with the custom method, asr factor, high latitude rule and offsets
+		(see configure) and the number of candidate configs evaluated'''
+	prayer_times = PrayerTimes()
+	jdate = np.array([prayer_times.julian(day.year, day.month, day.day) for day in dates]) - lng / (15 * 24.0)
+	if tz_name:
+		utc_offsets = get_timezone_table(tz_name).utcoffsets([day.toordinal() for day in dates])
+	else:
+		utc_offsets = timezone
+	tz_adjust = utc_offsets - lng / 15.0
+
+	# The sun positions of all the days, shared by every candidate
+	position = prayer_times.day_ephemeris_array(jdate, dict(INITIAL_TIMES))
+	rise_set_angle = prayer_times.rise_set_angle_array(alt)
+	sunrise = prayer_times.sun_angle_time_array(rise_set_angle, position['sunrise'], lat, 'ccw') + tz_adjust
+	sunset = prayer_times.sun_angle_time_array(rise_set_angle, position['sunset'], lat) + tz_adjust
+	night = prayer_times.time_diff_array(sunset, sunrise)
+
+	# Candidates on the first axis and days on the last
+	fajr_angles = parse_grid(ANGLES) if fajr_angles is None else np.asarray(fajr_angles, dtype=float)
+	isha_angles = parse_grid(ANGLES) if isha_angles is None else np.asarray(isha_angles, dtype=float)
+	fajr = prayer_times.sun_angle_time_array(fajr_angles[:, None], position['fajr'], lat, 'ccw') + tz_adjust
+	isha = prayer_times.sun_angle_time_array(isha_angles[:, None], position['isha'], lat) + tz_adjust
+	asr_factors = np.array([1.0, 2.0])
+	asr = prayer_times.asr_time_array(asr_factors[:, None], position['asr'], lat) + tz_adjust
+
+	angle_error = {}
+	best = None
+	for rule in HIGH_LAT_METHODS:
+		fajr_rule, isha_rule = fajr, isha
+		if rule != 'None':
+			fajr_rule = prayer_times.adjust_HL_time_array(
+				fajr, sunrise, prayer_times.night_portion(fajr_angles[:, None], night, rule), 'ccw')
+			isha_rule = prayer_times.adjust_HL_time_array(
+				isha, sunset, prayer_times.night_portion(isha_angles[:, None], night, rule))
+		for name, candidates in (("fajr", fajr_rule), ("isha", isha_rule)):
+			angle_error[name] = score(published[name], candidates)[1] if name in published else np.zeros(len(candidates))
+		error = angle_error["fajr"].min() + angle_error["isha"].min()
+		if best is None or error < best[0]:
+			best = (error, rule, fajr_angles[angle_error["fajr"].argmin()], isha_angles[angle_error["isha"].argmin()])
+	_, high_lats, fajr_angle, isha_angle = best
+
+	asr_param = ASR_FACTORS[score(published["asr"], asr)[1].argmin()] if "asr" in published else ASR_FACTORS[0]
+	fit = {
+		"method": {"fajr": float(fajr_angle), "isha": float(isha_angle), "maghrib": "0 min", "midnight": "Standard"},
+		"asr_factor": asr_param,
+		"high_lats": high_lats,
+	}
+
+	# The offsets are fitted on the times of the engine itself so that they include all its adjustments
+	prayer_times = configure(PrayerTimes(), fit, lat, lng, alt, timezone, tz_name)
+	times = times_on(prayer_times, dates)
+	fit["offset"] = {name: f"{int(score(published[name], times[name])[0])} min" for name in published}
+	candidates = len(fajr_angles) * len(isha_angles) * len(asr_factors) * len(HIGH_LAT_METHODS)
+	return fit, candidates
+
+def configure(prayer_times, fit, lat, lng, alt = 0, timezone = 0, tz_name = None):
+	'''Set a fitted method, its settings and offsets and a location on a prayer times calculator'''
+	prayer_times.settings.update(fit["method"])
+	prayer_times.settings["high_lats"] = fit["high_lats"]
+	prayer_times.asr_param = fit["asr_factor"]
+	prayer_times.offset.update(fit.get("offset", {}))
+	prayer_times.lat, prayer_times.lng, prayer_times.alt = lat, lng, alt
+	prayer_times.timezone, prayer_times.tz_name = timezone, tz_name
+	return prayer_times
+
+def times_on(prayer_times, dates):
+	'''Return the tuned times of the given dates as arrays'''
+	start, end = min(dates), max(dates)
+	table = prayer_times.range_table(start, date.fromordinal(end.toordinal() + 1))
+	index = [day.toordinal() - start.toordinal() for day in dates]
+	return {name: table[name][index] for name in TIME_NAMES}
+
+def residual_report(prayer_times, dates, published):
+	'''Return the mean and largest absolute differences in minutes and the share of days within a minute for every prayer'''
+	times = times_on(prayer_times, dates)
+	report = {}
+	for name, published_times in published.items():
+		residuals = np.abs((published_times - times[name] + 12) % 24 * 60 - 720)
+		residuals = residuals[~np.isnan(residuals)]
+		report[name] = {
+			"mean": round(float(residuals.mean()), 2), "max": round(float(residuals.max()), 2),
+			"within_minute": round(float((residuals <= 1).mean()), 3)
+		}
+	return report
+
+def parse_arguments(args = None):
+	'''Parse the command line arguments'''
+	parser = argparse.ArgumentParser(description="Fit a custom calculation method to a published prayer timetable")
+	parser.add_argument("timetable", help="CSV file with a date column and columns of published times")
+	parser.add_argument("--lat", type=float, required=True)
+	parser.add_argument("--lng", type=float, required=True)
+	parser.add_argument("--alt", type=float, default=0)
+	parser.add_argument("--timezone", type=float, default=0, help="UTC offset in hours")
+	parser.add_argument("--tz", default=None, help="timezone name, overrides --timezone and follows daylight saving time")
+	parser.add_argument("--fajr-angles", type=parse_grid, default=ANGLES, help="start:stop:step of the fajr angles")
+	parser.add_argument("--isha-angles", type=parse_grid, default=ANGLES, help="start:stop:step of the isha angles")
+	return parser.parse_args(args)
+
+def main(args = None):
+	'''Fit a method to a timetable and print it with its residual report as JSON'''
+	args = parse_arguments(args)
+	dates, published = read_timetable(args.timetable)
+	fit, candidates = fit_method(dates, published, args.lat, args.lng, args.alt, args.timezone, args.tz,
+								args.fajr_angles, args.isha_angles)
+	prayer_times = configure(PrayerTimes(), fit, args.lat, args.lng, args.alt, args.timezone, args.tz)
+	fit["residuals"] = residual_report(prayer_times, dates, published)
+	print(f"{candidates} candidate configs evaluated over {len(dates)} days", file=sys.stderr)
+	print(json.dumps(fit, indent=4))
+
+
+if __name__ == "__main__":
+	main()
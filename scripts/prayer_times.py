@@ -30,20 +30,206 @@ http://praytimes.org/calculation
 
 '''
 
+import hashlib
 import math
+import numbers
+import threading
+from bisect import bisect_right
+from collections import OrderedDict, namedtuple
+from dataclasses import dataclass
+from datetime import datetime, time, timedelta, timezone
+from functools import lru_cache
+
+import numpy as np
+
+from constants import KAABA_LAT, KAABA_LNG
+from timetable import Timetable
+from timezones import get_timezone_table, utcoffsets
+
+
+@dataclass(frozen=True)
+class CalculationConfig():
+	'''Immutable and hashable snapshot of every input of a prayer times calculation'''
+
+	settings: tuple
+	offset: tuple
+	asr_param: str = "Standard"
+	lat: float = 0
+	lng: float = 0
+	alt: float = 0
+	timezone: float = 0
+	time_format: str = "24h"
+	time_suffixes: tuple = ("am", "pm")
+	imsak_time: str = "Show"
+	tz_name: str = None
+	tolerance: float = None
+	max_iterations: int = 5
+	events: tuple = ()
+
+	def fingerprint(self):
+		'''Return a stable hash of the inputs that change the calculated times, ignoring the output format'''
+		# The fixed offset is not used when tz_name is set, so it changing with daylight saving time is ignored
+		timezone = None if self.tz_name else self.timezone
+		calculation = (self.settings, self.offset, self.asr_param, self.lat, self.lng, self.alt, timezone, self.tz_name,
+						self.tolerance, self.max_iterations, self.events)
+		return hashlib.sha1(repr(calculation).encode()).hexdigest()
+
+
+# Starting guesses of the prayer times in hours
+INITIAL_TIMES = {
+	'imsak': 5, 'fajr': 5, 'sunrise': 6, 'dhuhr': 12,
+	'asr': 13, 'sunset': 18, 'maghrib': 18, 'isha': 18
+}
+
+# Kinds of the extra events: the sun reaching an angle below the horizon (negative above it)
+# in the given direction, an asr-like shadow factor, minutes from mid-day or a portion of the night
+EVENT_KINDS = ('angle', 'factor', 'noon', 'night')
+
+# Common extra events which can be added to PrayerTimes.events
+EVENTS = {
+	'ishraq': {'angle': -3.5, 'direction': 'ccw'},
+	'duha': {'angle': -12, 'direction': 'ccw'},
+	'zawal': {'noon': -5},
+	'last_third': {'night': 2/3},
+}
+
+# Azimuths of the sun relative to the qibla bearing: facing the sun faces the qibla,
+# or the sun is behind so that shadows point to the qibla
+QIBLA_TIMES = {'qibla': 0, 'qibla_shadow': 180}
+# Hours between the instants searched for the qibla times before refining them
+QIBLA_GRID_STEP = 0.25
+
+# Numeric calculation parameters compiled from the string settings and offsets
+# The adjustments and offsets are in hours, night_portions are fractions of the night
+CalculationParams = namedtuple("CalculationParams", (
+	"imsak", "fajr", "maghrib", "isha", "imsak_min", "maghrib_min", "isha_min",
+	"dhuhr", "jummah", "asr_factor", "high_lats", "night_portions", "midnight", "offset", "events"
+))
+
+
+class WatchedDict(dict):
+	'''Dictionary calling a function whenever its items change
+
+		validate, if given, is called with the key and value of every item set and
+		raises to reject it, leaving the dictionary unchanged'''
+
+	def __init__(self, on_change, *args, validate = None, **kwargs):
+		super().__init__(*args, **kwargs)
+		self.on_change = on_change
+		self.validate = validate
+
+	def __setitem__(self, key, value):
+		if self.validate:
+			self.validate(key, value)
+		super().__setitem__(key, value)
+		self.on_change()
+
+	def __delitem__(self, key):
+		super().__delitem__(key)
+		self.on_change()
+
+	def update(self, *args, **kwargs):
+		items = dict(*args, **kwargs)
+		if self.validate:
+			for key, value in items.items():
+				self.validate(key, value)
+		super().update(items)
+		self.on_change()
+
+	def __ior__(self, other):
+		self.update(other)
+		return self
+
+	def setdefault(self, key, default = None):
+		if key not in self:
+			self[key] = default
+		return self[key]
+
+	def pop(self, key, *default):
+		value = super().pop(key, *default)
+		self.on_change()
+		return value
+
+	def popitem(self):
+		item = super().popitem()
+		self.on_change()
+		return item
+
+	def clear(self):
+		super().clear()
+		self.on_change()
+
+
+class StageCache():
+	'''Least recently used cache of the calculation stages of dates or date ranges
+
+		Every stage result is stored with the key of the inputs it was computed from,
+		which includes the key of the stage before it, so a stage is only computed
+		again when one of its own or its upstream inputs has changed'''
+
+	def __init__(self, maxsize = 64):
+		self.maxsize = maxsize
+		self.entries = OrderedDict()
+		self.lock = threading.Lock()
+
+	def stage(self, entry, stage, key, compute):
+		'''Return the cached result of a stage of an entry, computing it if its key changed'''
+		with self.lock:
+			stages = self.entries.get(entry)
+			if stages is None:
+				stages = self.entries[entry] = {}
+				if len(self.entries) > self.maxsize:
+					self.entries.popitem(last=False)
+			else:
+				self.entries.move_to_end(entry)
+			cached = stages.get(stage)
+
+		if cached is not None and cached[0] == key:
+			return cached[1]
+		value = compute()
+		with self.lock:
+			stages[stage] = (key, value)
+		return value
+
+	def get(self, entry, stage, key):
+		'''Return the cached result of a stage of an entry if it is up to date, or None'''
+		with self.lock:
+			cached = self.entries.get(entry, {}).get(stage)
+		return cached[1] if cached is not None and cached[0] == key else None
+
+	def clear(self):
+		'''Remove all the cached stages'''
+		with self.lock:
+			self.entries.clear()
 
 
 class PrayerTimes():
 	'''A class to hold all the prayer times calculation capabilities'''
 
 	def __init__(self) :
-		
+
+		self._params = None
 		self.time_suffixes = ["am", "pm"]
 		self.timezone = 0
+		# Name of the timezone, when set its UTC offset is looked up for every date instead of timezone
+		self.tz_name = None
 		self.time_format = "24h"
+		# Formatted times of every minute of the day by time format and suffixes (see format_table)
+		self.format_tables = {}
 		self.asr_param = "Standard"
 		self.imsak_time = "Show"
-		self.is_jummah = False
+
+		# Without a tolerance the times are computed in one pass from INITIAL_TIMES. With a tolerance in
+		# seconds passes are repeated, starting from the previous day's times when they are known,
+		# until the estimated error is below it or max_iterations passes were made
+		self.tolerance = None
+		self.max_iterations = 5
+		# Passes used by the last calculation of the astronomical times, an array of one count per day for ranges
+		self.iterations = 0
+
+		# Cached calculation stages of recent days and date ranges
+		self.day_cache = StageCache(64)
+		self.range_cache = StageCache(4)
 
 		self.lat = 0
 		self.lng = 0
@@ -53,7 +239,10 @@ class PrayerTimes():
 							'sunset', 'maghrib', 'isha', 'midnight'}
 
 		# Optional offsets to times
-		self.offset = {x : 0 for x in self.time_names}
+		self.offset = WatchedDict(self.invalidate_params, {x : 0 for x in self.time_names})
+
+		# Extra events computed with the times, mapping names to event definitions (see EVENTS)
+		self.events = WatchedDict(self.invalidate_params, validate=self.compile_event)
 
 
 		# Default Parameters in Calculation Methods
@@ -96,26 +285,251 @@ class PrayerTimes():
 
 
 		# initialize settings
-		self.settings = {
+		self.settings = WatchedDict(self.invalidate_params, {
 			"imsak": '10 min',
 			"dhuhr": '0 min',
 			"jummah": '0 min',
 			"high_lats": 'Night Middle',
-		}
+		})
 		self.set_method("Muslim World League")
 
+	@property
+	def asr_param(self):
+		'''Asr shadow factor setting'''
+		return self._asr_param
+
+	@asr_param.setter
+	def asr_param(self, value):
+		self._asr_param = value
+		self.invalidate_params()
+
+	@property
+	def params(self):
+		'''Numeric calculation parameters, compiled again only after the settings change'''
+		if self._params is None:
+			self._params = self.compile_params()
+		return self._params
+
+	def invalidate_params(self):
+		'''Mark the compiled calculation parameters as out of date'''
+		self._params = None
+
+	def compile_params(self, settings = None):
+		'''Compile the settings, or other settings, and the offsets into numeric calculation parameters'''
+		settings = settings or self.settings
+		angles = {name: self.eval(settings[name]) for name in ('imsak', 'fajr', 'maghrib', 'isha')}
+		return CalculationParams(
+			imsak=angles['imsak'], fajr=angles['fajr'], maghrib=angles['maghrib'], isha=angles['isha'],
+			imsak_min=self.is_min(settings['imsak']), maghrib_min=self.is_min(settings['maghrib']),
+			isha_min=self.is_min(settings['isha']),
+			dhuhr=self.eval(settings['dhuhr']) / 60.0, jummah=self.eval(settings['jummah']) / 60.0,
+			asr_factor=self.asr_factor(), high_lats=settings['high_lats'],
+			night_portions={name: self.night_portion(angle, 1, settings['high_lats']) for name, angle in angles.items()},
+			midnight=settings['midnight'],
+			offset={name: self.eval(value) / 60.0 for name, value in self.offset.items()},
+			events=tuple(self.compile_event(name, event) for name, event in self.events.items())
+		)
+
+	def compile_event(self, name, event):
+		'''Compile the definition of an extra event into a (name, kind, value, direction) tuple'''
+		if name in self.time_names:
+			raise ValueError(f"Event {name} would replace the prayer time of the same name")
+		kinds = [kind for kind in EVENT_KINDS if kind in event] if isinstance(event, dict) else []
+		if len(kinds) != 1:
+			raise ValueError(f"Event {name} needs exactly one of {', '.join(EVENT_KINDS)}, got {event}")
+		value = event[kinds[0]]
+		if isinstance(value, bool) or not isinstance(value, numbers.Real):
+			raise ValueError(f"Event {name} needs a number for its {kinds[0]}, got {value!r}")
+		return (name, kinds[0], value, event.get('direction'))
+
+	@classmethod
+	def from_config(cls, config):
+		'''Create a prayer times calculator from a calculation config'''
+		prayer_times = cls()
+		prayer_times.settings.update(config.settings)
+		prayer_times.offset.update(config.offset)
+		prayer_times.asr_param = config.asr_param
+		prayer_times.lat = config.lat
+		prayer_times.lng = config.lng
+		prayer_times.alt = config.alt
+		prayer_times.timezone = config.timezone
+		prayer_times.time_format = config.time_format
+		prayer_times.time_suffixes = list(config.time_suffixes)
+		prayer_times.imsak_time = config.imsak_time
+		prayer_times.tz_name = config.tz_name
+		prayer_times.tolerance = config.tolerance
+		prayer_times.max_iterations = config.max_iterations
+		prayer_times.events.update((name, dict(event)) for name, event in config.events)
+		return prayer_times
+
+	def get_config(self):
+		'''Return an immutable snapshot of the current calculation settings'''
+		return CalculationConfig(
+			settings=tuple(sorted(self.settings.items())), offset=tuple(sorted(self.offset.items())),
+			asr_param=self.asr_param, lat=self.lat, lng=self.lng, alt=self.alt, timezone=self.timezone,
+			time_format=self.time_format, time_suffixes=tuple(self.time_suffixes), imsak_time=self.imsak_time,
+			tz_name=self.tz_name, tolerance=self.tolerance, max_iterations=self.max_iterations,
+			events=tuple((name, tuple(sorted(event.items()))) for name, event in self.events.items())
+		)
+
+	def stage_keys(self):
+		'''Return the inputs of every calculation stage, each including the keys of the stages before it'''
+		params = self.params
+		astronomy = (self.lat, self.lng, self.alt, self.tolerance, self.max_iterations,
+					params.imsak, params.fajr, params.maghrib, params.isha, params.asr_factor, params.events)
+		adjusted = (astronomy, self.timezone, self.tz_name, params.imsak_min, params.maghrib_min, params.isha_min,
+					params.dhuhr, params.jummah, params.high_lats, params.night_portions, params.midnight)
+		tuned = (adjusted, params.offset)
+		formatted = (tuned, self.time_format, tuple(self.time_suffixes), self.imsak_time)
+		return astronomy, adjusted, tuned, formatted
 
 	def set_method(self, method):
 		'''Set the method of measuring prayer time'''
 		self.settings.update(self.methods[method])
 
-	def get_times(self, date):
-		'''Return prayer times for a given date'''
-		if date.weekday() == 4:
-			self.is_jummah = True
+	def utcoffset(self, date):
+		'''Return the UTC offset in hours on a date, following daylight saving time if tz_name is set'''
+		if self.tz_name:
+			return get_timezone_table(self.tz_name).utcoffset(date)
+		return self.timezone
+
+	def get_times(self, date, output = "text"):
+		'''Return prayer times for a given date
+
+			output selects the type of the times: "text" for strings in the time format,
+			"seconds" for integer seconds since midnight or "datetime" for timezone-aware
+			datetimes. Numeric times that do not exist are None'''
+		keys = self.stage_keys()
+		tuned = self.tuned_times(date, keys)
+		return dict(self.day_cache.stage(date, output, keys[3], lambda: self.format_times(dict(tuned), date, output)))
+
+	def tuned_times(self, date, keys = None):
+		'''Return the cached float hours of all the times of a date before formatting'''
+		astronomy_key, adjusted_key, tuned_key, _ = keys or self.stage_keys()
+		jdate = self.julian(date.year, date.month, date.day) - self.lng / (15 * 24.0)
+		stage = self.day_cache.stage
+
+		# Refinement starts from the previous day's times when they are cached
+		previous = self.day_cache.get(date - timedelta(1), 'astronomy', astronomy_key) if self.tolerance is not None else None
+		raw = stage(date, 'astronomy', astronomy_key, lambda: self.astronomy_times(jdate, previous))
+		# Friday is weekday 4
+		adjusted = stage(date, 'adjusted', adjusted_key,
+						lambda: self.adjusted_times(dict(raw), date.weekday() == 4, self.utcoffset(date)))
+		return stage(date, 'tuned', tuned_key, lambda: self.tune_times(dict(adjusted)))
+
+	def next_event(self, now, names = None):
+		'''Return the first time after now as a (name, datetime, time left) tuple
+
+			now is a timezone-aware datetime. Yesterday's, today's and tomorrow's times are
+			searched so that after the last time of the day it rolls over to the next day.
+			names limits the search to some of the times. Returns None if no time is left'''
+		today = now.astimezone(timezone(timedelta(hours=self.utcoffset(now.date())))).date()
+		timestamps, events = self.event_table(today, names)
+		index = bisect_right(timestamps, now.timestamp())
+		if index == len(events):
+			return None
+		name, time = events[index]
+		return name, time, time - now
+
+	def event_table(self, date, names = None):
+		'''Return the cached, sorted timestamps and (name, datetime) events around a date'''
+		keys = self.stage_keys()
+		names = tuple(names) if names else tuple(INITIAL_TIMES) + ('midnight',)
+		return self.day_cache.stage(date, ('events', names), keys[3], lambda: self.build_event_table(date, names, keys))
+
+	def build_event_table(self, date, names, keys):
+		'''Build the sorted timestamps and (name, datetime) events of a date and the days before and after it'''
+		events = []
+		for day in (date - timedelta(1), date, date + timedelta(1)):
+			midnight = datetime.combine(day, time(), tzinfo=timezone(timedelta(hours=self.utcoffset(day))))
+			for name, hours in self.tuned_times(day, keys).items():
+				if name in names and not math.isnan(hours) and (name != "imsak" or self.imsak_time == "Show"):
+					# The unwrapped hours place a midnight past 24h on the following day
+					events.append((midnight + timedelta(hours=hours), name))
+
+		events.sort()
+		return [event.timestamp() for event, _ in events], [(name, event) for event, name in events]
+
+	def get_times_range(self, start, end):
+		'''Return prayer times for every date from start up to (not including) end
+
+			The result is column-oriented, mapping each time name to a NumPy array
+			of float hours with one entry per day (NaN where a time does not exist)'''
+		tuned_key = self.stage_keys()[2]
+		times = dict(self.range_cache.stage((start, end), 'wrapped', tuned_key, lambda: self.read_only(
+			{name: self.fixhour_array(time) for name, time in self.range_table(start, end).items()})))
+		if self.imsak_time != "Show":
+			del times["imsak"]
+		return times
 
-		self.jDate = self.julian(date.year, date.month, date.day) - self.lng / (15 * 24.0)
-		times = self.compute_times()
+	def get_timetable(self, start, end):
+		'''Return the prayer times from start up to (not including) end as a compact Timetable of minutes'''
+		return Timetable.from_times(start, self.get_times_range(start, end))
+
+	def range_table(self, start, end):
+		'''Return the table of all the tuned times from start up to (not including) end, ignoring imsak_time
+
+			The times are not brought into 0-24 hours, like those of tuned_times, so a
+			time past midnight stays after 24 hours instead of going to the start of the day'''
+		jdate, jummah, utc_offsets = self.range_inputs(start, end)
+		astronomy_key, adjusted_key, tuned_key, _ = self.stage_keys()
+		stage = self.range_cache.stage
+		entry = (start, end)
+
+		raw = stage(entry, 'astronomy', astronomy_key, lambda: self.astronomy_times_array(jdate, self.lat, self.alt))
+		adjusted = stage(entry, 'adjusted', adjusted_key,
+					lambda: self.adjusted_times_array(raw, jummah, self.lng, utc_offsets))
+		return dict(stage(entry, 'tuned', tuned_key, lambda: self.read_only(self.tune_times_array(adjusted))))
+
+	def range_inputs(self, start, end):
+		'''Return the julian dates, the Fridays and the UTC offsets of the days from start up to (not including) end'''
+		days = np.arange(end.toordinal() - start.toordinal())
+		jdate = self.julian(start.year, start.month, start.day) + days - self.lng / (15 * 24.0)
+		# Friday is weekday 4
+		jummah = (start.weekday() + days) % 7 == 4
+		if self.tz_name:
+			utc_offsets = get_timezone_table(self.tz_name).utcoffsets(start.toordinal() + days)
+		else:
+			utc_offsets = self.timezone
+		return jdate, jummah, utc_offsets
+
+	def compare_methods(self, start, end = None):
+		'''Return the prayer times of every calculation method from start up to (not including) end
+
+			Without end the times of start alone are returned. The sun positions are computed
+			once, in a single pass, and the angles of all the methods are broadcast over them.
+			The result maps each method name to a table like the one of get_times_range'''
+		end = end or start + timedelta(1)
+		jdate, jummah, utc_offsets = self.range_inputs(start, end)
+		names = list(self.methods)
+		params = [self.compile_params({**self.settings, **self.methods[name]}) for name in names]
+
+		# Methods on the first axis and days on the last
+		angles = {angle: np.array([getattr(p, angle) for p in params])[:, None] for angle in ('imsak', 'fajr', 'maghrib', 'isha')}
+		raw = self.compute_prayer_times_array(jdate, self.initial_times(), self.lat, self.alt, self.params._replace(**angles))
+		shape = (len(names), len(jdate))
+
+		tables = {}
+		for i, name in enumerate(names):
+			times = {time_name: np.broadcast_to(time, shape)[i] for time_name, time in raw.items()}
+			times = self.adjusted_times_array(times, jummah, self.lng, utc_offsets, params[i])
+			tables[name] = self.read_only(self.tuned_times_array(times, params[i]))
+			if self.imsak_time != "Show":
+				del tables[name]["imsak"]
+		return tables
+
+	def get_times_batch(self, date, lat, lng, alt = 0, timezone = 0):
+		'''Return prayer times of a given date for many locations at once
+
+			lat, lng, alt and timezone are array-likes broadcast against each other,
+			timezone holding either UTC offsets in hours or timezone names. The result
+			maps each time name to a NumPy array of float hours with one entry per
+			location (NaN where a time does not exist)'''
+		if np.asarray(timezone).dtype.kind in "OUS":
+			timezone = utcoffsets(timezone, date)
+		lat, lng, alt, timezone = np.broadcast_arrays(*(np.asarray(x, dtype=float) for x in (lat, lng, alt, timezone)))
+		jdate = self.julian(date.year, date.month, date.day) - lng / (15 * 24.0)
+		times = self.compute_times_array(jdate, date.weekday() == 4, lat, lng, alt, timezone)
 
 		if self.imsak_time != "Show":
 			del times["imsak"]
@@ -132,6 +546,32 @@ class PrayerTimes():
 		hours = math.floor(time)
 
 		minutes = math.floor((time- hours)* 60)
+		return self.format_table(suffixes)[(hours * 60 + minutes) % 1440]
+
+	def get_formatted_times_array(self, times, suffixes = None):
+		'''Convert an array of float times to the given format, '----' where a time does not exist'''
+		if suffixes == None:
+			suffixes = self.time_suffixes
+
+		missing = np.isnan(times)
+		times = self.fixhour_array(np.where(missing, 0, times) + 0.5 / 60)
+		hours = np.floor(times)
+		minutes = (hours * 60 + np.floor((times - hours) * 60)) % 1440
+		# The entry after the last minute of the day is the missing time
+		return self.format_table(suffixes)[np.where(missing, 1440, minutes).astype(int)]
+
+	def format_table(self, suffixes):
+		'''Return the formatted times of every minute of the day, built once for every time format and suffixes'''
+		key = (self.time_format, tuple(suffixes))
+		table = self.format_tables.get(key)
+		if table is None:
+			table = np.array([self.format_minute(minute, suffixes) for minute in range(1440)] + ['----'], dtype=object)
+			self.format_tables[key] = table
+		return table
+
+	def format_minute(self, minute, suffixes):
+		'''Convert a minute of the day to the time format'''
+		hours, minutes = divmod(minute, 60)
 		suffix = suffixes[ 0 if hours < 12 else 1 ] if self.time_format == '12h' else ''
 		formattedTime = f"%02d:%02d" % (hours, minutes) if self.time_format == "24h" else "%d:%02d" % ((hours+11)%12+1, minutes)
 		return formattedTime + " " + suffix
@@ -139,28 +579,28 @@ class PrayerTimes():
 
 	#---------------------- Calculation Functions -----------------------
 
-	def mid_day(self, time):
-		'''Compute mid-day time'''
-		eqt = self.sun_position(self.jDate + time)[1]
+	def mid_day(self, position):
+		'''Compute mid-day time from the sun position'''
+		eqt = position[1]
 		return self.fixhour(12 - eqt)
 
-	def sun_angle_time(self, angle, time, direction = None):
+	def sun_angle_time(self, angle, position, direction = None):
 		'''Compute the time at which sun reaches a specific angle below horizon'''
 
 		try:
-			decl = self.sun_position(self.jDate + time)[0]
-			noon = self.mid_day(time)
+			decl = position[0]
+			noon = self.mid_day(position)
 			t = 1/15.0* self.arccos((-self.sin(angle)- self.sin(decl)* self.sin(self.lat))/
 					(self.cos(decl)* self.cos(self.lat)))
 			return noon+ (-t if direction == 'ccw' else t)
 		except ValueError:
 			return float('nan')
 
-	def asr_time(self, factor, time):
+	def asr_time(self, factor, position):
 		'''Compute asr time'''
-		decl = self.sun_position(self.jDate + time)[0]
+		decl = position[0]
 		angle = -self.arccot(factor + self.tan(abs(self.lat - decl)))
-		return self.sun_angle_time(angle, time)
+		return self.sun_angle_time(angle, position)
 
 	def sun_position(self, jd):
 		'''Compute declination angle of sun and equation of time
@@ -180,6 +620,11 @@ class PrayerTimes():
 
 		return (decl, eqt)
 
+	def day_ephemeris(self, jdate, times):
+		'''Compute the sun position once for every distinct day portion of the times'''
+		positions = {time: self.sun_position(jdate + time) for time in set(times.values())}
+		return {name: positions[time] for name, time in times.items()}
+
 	def julian(self, year, month, day):
 		'''Convert Gregorian date to Julian day
 			Ref: Astronomical Algorithms by Jean Meeus'''
@@ -195,68 +640,131 @@ class PrayerTimes():
 
 	#---------------------- Compute Prayer Times -----------------------
 
-	def compute_prayer_times(self, times):
+	def compute_prayer_times(self, jdate, times):
 		'''Compute prayer times at given julian date'''
 		times = self.day_portion(times)
-		params = self.settings
-
-		imsak   = self.sun_angle_time(self.eval(params['imsak']), times['imsak'], 'ccw')
-		fajr    = self.sun_angle_time(self.eval(params['fajr']), times['fajr'], 'ccw')
-		sunrise = self.sun_angle_time(self.rise_set_angle(self.alt), times['sunrise'], 'ccw')
-		dhuhr   = self.mid_day(times['dhuhr'])
-		asr     = self.asr_time(self.asr_factor(), times['asr'])
-		sunset  = self.sun_angle_time(self.rise_set_angle(self.alt), times['sunset'])
-		maghrib = self.sun_angle_time(self.eval(params['maghrib']), times['maghrib'])
-		isha    = self.sun_angle_time(self.eval(params['isha']), times['isha'])
+		params = self.params
+		position = self.day_ephemeris(jdate, times)
+
+		imsak   = self.sun_angle_time(params.imsak, position['imsak'], 'ccw')
+		fajr    = self.sun_angle_time(params.fajr, position['fajr'], 'ccw')
+		sunrise = self.sun_angle_time(self.rise_set_angle(self.alt), position['sunrise'], 'ccw')
+		dhuhr   = self.mid_day(position['dhuhr'])
+		asr     = self.asr_time(params.asr_factor, position['asr'])
+		sunset  = self.sun_angle_time(self.rise_set_angle(self.alt), position['sunset'])
+		maghrib = self.sun_angle_time(params.maghrib, position['maghrib'])
+		isha    = self.sun_angle_time(params.isha, position['isha'])
 		return {
 			'imsak': imsak, 'fajr': fajr, 'sunrise': sunrise, 'dhuhr': dhuhr,
-			'asr': asr, 'sunset': sunset, 'maghrib': maghrib, 'isha': isha
+			'asr': asr, 'sunset': sunset, 'maghrib': maghrib, 'isha': isha,
+			**self.event_times(position)
 		}
 
-	def compute_times(self):
-		'''Compute prayer times'''
-		num_iterations = 1
-		times = {
-			'imsak': 5, 'fajr': 5, 'sunrise': 6, 'dhuhr': 12,
-			'asr': 13, 'sunset': 18, 'maghrib': 18, 'isha': 18
-		}
+	def event_times(self, position):
+		'''Compute the extra events found from the sun position, sharing the positions of the standard times'''
+		times = {}
+		for name, kind, value, direction in self.params.events:
+			if kind == 'angle':
+				times[name] = self.sun_angle_time(value, position[name], direction)
+			elif kind == 'factor':
+				times[name] = self.asr_time(value, position[name])
+			elif kind == 'noon':
+				times[name] = self.mid_day(position[name]) + value / 60.0
+		return times
 
-		# main iterations
-		for _ in range(num_iterations):
-			times = self.compute_prayer_times(times)
+	def night_event_times(self, times):
+		'''Compute the extra events placed at a portion of the night from sunset to sunrise'''
+		night = self.time_diff(times['sunset'], times['sunrise'])
+		return {name: times['sunset'] + value * night for name, kind, value, _ in self.params.events if kind == 'night'}
+
+	def astronomy_times(self, jdate, seed = None):
+		'''Compute the raw astronomical prayer times in local solar time
+
+			With a tolerance the passes start from the seed times, if given, and are
+			repeated until the times converge (see refinement_error)'''
+		if self.tolerance is None:
+			self.iterations = 1
+			return self.compute_prayer_times(jdate, self.initial_times())
+
+		times = self.seed_times(seed or self.initial_times())
+		# The previous day's times are off by about their change over a step of 24 hours
+		steps = dict.fromkeys(times, 24.0) if seed else None
+		for iteration in range(1, self.max_iterations + 1):
+			refined = self.compute_prayer_times(jdate, dict(times))
+			changes = {name: 0 if math.isnan(time) else abs(time - times[name]) for name, time in refined.items()}
+			times = self.seed_times(refined)
+			if self.refinement_error(changes, steps) < self.tolerance:
+				break
+			steps = changes
+		self.iterations = iteration
+		return refined
+
+	def initial_times(self):
+		'''Return the starting guesses of the times and of the extra events found from the sun position
+
+			An event starts from the guess of the standard time it is nearest to, so that it shares its sun position'''
+		times = dict(INITIAL_TIMES)
+		for name, kind, _, direction in self.params.events:
+			if kind == 'angle':
+				times[name] = INITIAL_TIMES['sunrise' if direction == 'ccw' else 'sunset']
+			elif kind == 'factor':
+				times[name] = INITIAL_TIMES['asr']
+			elif kind == 'noon':
+				times[name] = INITIAL_TIMES['dhuhr']
+		return times
 
-		
-		times = self.adjust_times(times)
+	def seed_times(self, times):
+		'''Return the times to start a pass from, using the starting guesses for the times that do not exist'''
+		initial = self.initial_times()
+		return {name: initial[name] if math.isnan(times[name]) else times[name] for name in initial}
+
+	def refinement_error(self, changes, steps):
+		'''Estimate the largest error in seconds left in the times after a pass
+
+			The changes made by the passes shrink geometrically, by the ratio of the changes
+			of a pass to the changes of the pass before (steps), so the error left is the
+			sum of the changes still to come. Without steps the error is unknown'''
+		if steps is None:
+			return math.inf
+		error = 0
+		for name, change in changes.items():
+			rate = change / steps[name] if steps[name] else (math.inf if change else 0)
+			error = max(error, change * rate / (1 - rate) if rate < 1 else math.inf)
+		return error * 3600
+
+	def adjusted_times(self, times, jummah, timezone):
+		'''Adjust raw prayer times to the timezone and the method settings and add midnight'''
+		times = self.adjust_times(times, jummah, timezone)
 		# add midnight time
-		if self.settings['midnight'] == 'Jafari':
+		if self.params.midnight == 'Jafari':
 			times['midnight'] = times['sunset'] + self.time_diff(times['sunset'], times['fajr']) / 2
 		else:
 			times['midnight'] = times['sunset'] + self.time_diff(times['sunset'], times['sunrise']) / 2
+		times.update(self.night_event_times(times))
+		return times
 
-		times = self.tune_times(times)
-		return self.modify_formats(times)
-
-	def adjust_times(self, times):
+	def adjust_times(self, times, jummah, timezone):
 		'''Adjust times in a prayer time array'''
-		tz_adjust = self.timezone - self.lng / 15.0
+		params = self.params
+		tz_adjust = timezone - self.lng / 15.0
 		for t in times.keys():
 			times[t] += tz_adjust
 
-		if self.settings['high_lats'] != 'None':
+		if params.high_lats != 'None':
 			times = self.adjust_high_lats(times)
 
-		if self.is_min(self.settings['imsak']):
-			times['imsak'] = times['fajr'] - self.eval(self.settings['imsak']) / 60.0
+		if params.imsak_min:
+			times['imsak'] = times['fajr'] - params.imsak / 60.0
 		# need to ask about 'min' settings
-		if self.is_min(self.settings['maghrib']):
-			times['maghrib'] = times['sunset'] - self.eval(self.settings['maghrib']) / 60.0
+		if params.maghrib_min:
+			times['maghrib'] = times['sunset'] - params.maghrib / 60.0
 
-		if self.is_min(self.settings['isha']):
-			times['isha'] = times['maghrib'] - self.eval(self.settings['isha']) / 60.0
-		times['dhuhr'] += self.eval(self.settings['dhuhr']) / 60.0
+		if params.isha_min:
+			times['isha'] = times['maghrib'] - params.isha / 60.0
+		times['dhuhr'] += params.dhuhr
 
-		if self.is_jummah:
-			times["dhuhr"] += self.eval(self.settings["jummah"]) / 60.0
+		if jummah:
+			times["dhuhr"] += params.jummah
 
 		return times
 
@@ -272,40 +780,65 @@ class PrayerTimes():
 
 	def tune_times(self, times):
 		'''Apply offsets to the times'''
+		offset = self.params.offset
 		for name in times.keys():
-			times[name] += self.eval(self.offset[name]) / 60.0
+			times[name] += offset.get(name, 0)
 		return times
 
+	def format_times(self, times, date, output = "text"):
+		'''Convert tuned times to the requested output type (see get_times)'''
+		if self.imsak_time != "Show":
+			del times["imsak"]
+
+		if output == "seconds":
+			return self.seconds_formats(times)
+		elif output == "datetime":
+			return self.datetime_formats(times, date)
+		return self.modify_formats(times)
+
 	def modify_formats(self, times):
 		'''Convert times to given time format'''
 		for name in times.keys():
 			times[name] = self.get_formatted_time(times[name])
 		return times
 
+	def seconds_formats(self, times):
+		'''Convert times to seconds since midnight'''
+		for name, time in times.items():
+			times[name] = None if math.isnan(time) else round(self.fixhour(time) * 3600) % 86400
+		return times
+
+	def datetime_formats(self, times, date):
+		'''Convert times to timezone-aware datetimes counted from the midnight of the given date'''
+		midnight = datetime.combine(date, time(), tzinfo=timezone(timedelta(hours=self.utcoffset(date))))
+		for name, hours in times.items():
+			# The unwrapped hours place a time past 24h on the following day, like build_event_table
+			times[name] = None if math.isnan(hours) else midnight + timedelta(seconds=round(hours * 3600))
+		return times
+
 	def adjust_high_lats(self, times):
 		'''Adjust times for locations in higher latitudes'''
 
-		params = self.settings
+		portions = self.params.night_portions
 		nightTime = self.time_diff(times['sunset'], times['sunrise']) # sunset to sunrise
-		times['imsak'] = self.adjust_HL_time(times['imsak'], times['sunrise'], self.eval(params['imsak']), nightTime, 'ccw')
-		times['fajr']  = self.adjust_HL_time(times['fajr'], times['sunrise'], self.eval(params['fajr']), nightTime, 'ccw')
-		times['isha']  = self.adjust_HL_time(times['isha'], times['sunset'], self.eval(params['isha']), nightTime)
-		times['maghrib'] = self.adjust_HL_time(times['maghrib'], times['sunset'], self.eval(params['maghrib']), nightTime)
+		times['imsak'] = self.adjust_HL_time(times['imsak'], times['sunrise'], portions['imsak'] * nightTime, 'ccw')
+		times['fajr']  = self.adjust_HL_time(times['fajr'], times['sunrise'], portions['fajr'] * nightTime, 'ccw')
+		times['isha']  = self.adjust_HL_time(times['isha'], times['sunset'], portions['isha'] * nightTime)
+		times['maghrib'] = self.adjust_HL_time(times['maghrib'], times['sunset'], portions['maghrib'] * nightTime)
 		return times
 
-	def adjust_HL_time(self, time, base, angle, night, direction = None):
-		'''Adjust a time for higher latitudes'''
+	def adjust_HL_time(self, time, base, portion, direction = None):
+		'''Adjust a time for higher latitudes by at most the given portion of the night'''
 
-		portion = self.night_portion(angle, night)
 		diff = self.time_diff(time, base) if direction == 'ccw' else self.time_diff(base, time)
 		if math.isnan(time) or diff > portion:
 			time = base + (-portion if direction == 'ccw' else portion)
 		return time
 
-	def night_portion(self, angle, night):
+	def night_portion(self, angle, night, method = None):
 		'''The night portion used for adjusting times in higher latitudes'''
 
-		method = self.settings['high_lats']
+		method = method or self.settings['high_lats']
 		portion = 1/2.0  # midnight
 		if method == 'Angle Based':
 			portion = 1/60.0 * angle
@@ -320,6 +853,277 @@ class PrayerTimes():
 		return times
 
 
+	#---------------------- Vectorized Prayer Times -----------------------
+
+	def mid_day_array(self, position):
+		'''Compute mid-day times from arrays of sun positions'''
+		eqt = position[1]
+		return self.fixhour_array(12 - eqt)
+
+	def sun_angle_time_array(self, angle, position, lat, direction = None):
+		'''Compute the times at which sun reaches a specific angle below horizon for arrays of sun positions and latitudes'''
+		decl = position[0]
+		noon = self.mid_day_array(position)
+		with np.errstate(divide='ignore', invalid='ignore'):
+			t = 1/15.0* self.arccos_array((-self.sin_array(angle)- self.sin_array(decl)* self.sin_array(lat))/
+					(self.cos_array(decl)* self.cos_array(lat)))
+		return noon+ (-t if direction == 'ccw' else t)
+
+	def asr_time_array(self, factor, position, lat):
+		'''Compute asr times for arrays of sun positions and latitudes'''
+		decl = position[0]
+		angle = -self.arccot_array(factor + self.tan_array(abs(lat - decl)))
+		return self.sun_angle_time_array(angle, position, lat)
+
+	def sun_position_array(self, jd):
+		'''Compute declination angle of sun and equation of time for an array of julian dates'''
+
+		D = jd - 2451545.0
+		g = self.fixangle_array(357.529 + 0.98560028* D)
+		q = self.fixangle_array(280.459 + 0.98564736* D)
+		L = self.fixangle_array(q + 1.915* self.sin_array(g) + 0.020* self.sin_array(2*g))
+
+		e = 23.439 - 0.00000036* D
+
+		RA = self.arctan2_array(self.cos_array(e)* self.sin_array(L), self.cos_array(L))/ 15.0
+		eqt = q/15.0 - self.fixhour_array(RA)
+		decl = self.arcsin_array(self.sin_array(e)* self.sin_array(L))
+
+		return (decl, eqt)
+
+	def sun_horizon_array(self, jd, lat, lng, position = None):
+		'''Compute azimuths and altitudes of sun for arrays of julian dates (with the time of day) and positions
+
+			position is the sun position at the julian dates, computed when it is not given'''
+		decl, eqt = position if position is not None else self.sun_position_array(jd)
+		# Hour angle from the apparent solar time at the longitude
+		hour_angle = 15 * ((jd + 0.5) % 1 * 24 + lng / 15.0 + eqt - 12)
+		sin_lat, cos_lat = self.sin_array(lat), self.cos_array(lat)
+		sin_decl, cos_decl = self.sin_array(decl), self.cos_array(decl)
+		cos_hour_angle = self.cos_array(hour_angle)
+		altitude = self.arcsin_array(sin_lat* sin_decl+ cos_lat* cos_decl* cos_hour_angle)
+		azimuth = self.fixangle_array(self.arctan2_array(-cos_decl* self.sin_array(hour_angle),
+				sin_decl* cos_lat- cos_decl* sin_lat* cos_hour_angle))
+		return (azimuth, altitude)
+
+	def azimuth_difference_array(self, midnight, time, azimuth):
+		'''Return the differences between the azimuths of sun at hours after midnight and an azimuth, within ±180°'''
+		azimuth_at, _ = self.sun_horizon_array(midnight + time / 24.0, self.lat, self.lng)
+		return self.fix_array(azimuth_at - azimuth + 180, 360.0) - 180
+
+	def qibla_alignment_array(self, midnight, azimuth, lower, upper):
+		'''Refine the hours after midnight at which sun reaches an azimuth, bracketed by lower and upper
+
+			Uses the Illinois variant of regula falsi on the azimuth differences of the brackets,
+			NaN where it does not converge'''
+		lower, upper = lower.astype(float), upper.astype(float)
+		lower_difference = self.azimuth_difference_array(midnight, lower, azimuth)
+		upper_difference = self.azimuth_difference_array(midnight, upper, azimuth)
+		# Only the alignments that have not converged yet are refined again
+		pending = np.arange(len(upper))
+		for _ in range(30):
+			with np.errstate(divide='ignore', invalid='ignore'):
+				time = upper[pending] - upper_difference[pending] * (upper[pending] - lower[pending]) / \
+						(upper_difference[pending] - lower_difference[pending])
+			difference = self.azimuth_difference_array(midnight[pending], time, azimuth)
+			# Keep the bracket around the alignment, halving the difference of a side kept twice
+			crossed = np.signbit(difference) != np.signbit(upper_difference[pending])
+			lower_difference[pending] = np.where(crossed, upper_difference[pending], lower_difference[pending] / 2)
+			lower[pending] = np.where(crossed, upper[pending], lower[pending])
+			converged = ~(abs(time - upper[pending]) >= 1e-5)
+			upper[pending], upper_difference[pending] = time, difference
+			pending = pending[~converged]
+			if not pending.size:
+				break
+		upper[pending] = np.nan
+		return upper
+
+	def julian_instants(self, instants):
+		'''Convert POSIX timestamps, datetime64 values or timezone-aware datetimes into julian dates'''
+		instants = np.asarray(instants)
+		if instants.dtype.kind == 'M':
+			seconds = (instants - np.datetime64(0, 's')) / np.timedelta64(1, 's')
+		elif instants.dtype.kind == 'O':
+			seconds = np.vectorize(lambda instant: instant.timestamp(), otypes = [float])(instants)
+		else:
+			seconds = instants.astype(float)
+		return seconds / 86400.0 + 2440587.5
+
+	def day_ephemeris_array(self, jdate, times):
+		'''Compute the sun positions for an array of julian dates once for every distinct starting hour or array of hours'''
+		keys = {name: time if np.ndim(time) == 0 else id(time) for name, time in times.items()}
+		positions = {}
+		for name, time in times.items():
+			if keys[name] not in positions:
+				positions[keys[name]] = self.sun_position_array(jdate + time / 24.0)
+		return {name: positions[key] for name, key in keys.items()}
+
+	def compute_prayer_times_array(self, jdate, times, lat, alt, params = None):
+		'''Compute prayer times at arrays of julian dates, latitudes and altitudes
+
+			The angles of params may also be arrays broadcast against the dates'''
+		params = params or self.params
+		position = self.day_ephemeris_array(jdate, times)
+		rise_set_angle = self.rise_set_angle_array(alt)
+
+		imsak   = self.sun_angle_time_array(params.imsak, position['imsak'], lat, 'ccw')
+		fajr    = self.sun_angle_time_array(params.fajr, position['fajr'], lat, 'ccw')
+		sunrise = self.sun_angle_time_array(rise_set_angle, position['sunrise'], lat, 'ccw')
+		dhuhr   = self.mid_day_array(position['dhuhr'])
+		asr     = self.asr_time_array(params.asr_factor, position['asr'], lat)
+		sunset  = self.sun_angle_time_array(rise_set_angle, position['sunset'], lat)
+		maghrib = self.sun_angle_time_array(params.maghrib, position['maghrib'], lat)
+		isha    = self.sun_angle_time_array(params.isha, position['isha'], lat)
+		return {
+			'imsak': imsak, 'fajr': fajr, 'sunrise': sunrise, 'dhuhr': dhuhr,
+			'asr': asr, 'sunset': sunset, 'maghrib': maghrib, 'isha': isha,
+			**self.event_times_array(position, lat, params)
+		}
+
+	def event_times_array(self, position, lat, params = None):
+		'''Compute the extra events found from arrays of sun positions (see event_times)'''
+		times = {}
+		for name, kind, value, direction in (params or self.params).events:
+			if kind == 'angle':
+				times[name] = self.sun_angle_time_array(value, position[name], lat, direction)
+			elif kind == 'factor':
+				times[name] = self.asr_time_array(value, position[name], lat)
+			elif kind == 'noon':
+				times[name] = self.mid_day_array(position[name]) + value / 60.0
+		return times
+
+	def night_event_times_array(self, times, params = None):
+		'''Compute the extra events placed at a portion of the night for arrays of times (see night_event_times)'''
+		night = self.time_diff_array(times['sunset'], times['sunrise'])
+		return {name: times['sunset'] + value * night for name, kind, value, _ in (params or self.params).events if kind == 'night'}
+
+	def astronomy_times_array(self, jdate, lat, alt):
+		'''Compute the raw astronomical prayer times for arrays of julian dates and locations
+
+			With a tolerance the passes after the first one start from the times of the
+			pass before and only recompute the entries that have not converged yet'''
+		initial = self.initial_times()
+		times = self.compute_prayer_times_array(jdate, dict(initial), lat, alt)
+		if self.tolerance is None:
+			self.iterations = np.ones(np.shape(times['dhuhr']), dtype=int)
+			return times
+
+		jdate, lat, alt = (np.broadcast_to(x, times['dhuhr'].shape) for x in (jdate, lat, alt))
+		iterations = np.ones(jdate.shape, dtype=int)
+		steps = {name: np.nan_to_num(np.abs(times[name] - initial[name])) for name in initial}
+		pending = np.ones(jdate.shape, dtype=bool)
+		for _ in range(1, self.max_iterations):
+			index = np.nonzero(pending)
+			if not index[0].size:
+				break
+			seed = self.seed_times_array({name: time[index] for name, time in times.items()})
+			refined = self.compute_prayer_times_array(jdate[index], seed, lat[index], alt[index])
+			changes = {name: np.nan_to_num(np.abs(time - seed[name])) for name, time in refined.items()}
+			error = self.refinement_error_array(changes, {name: step[index] for name, step in steps.items()})
+			for name, time in refined.items():
+				times[name][index] = time
+				steps[name][index] = changes[name]
+			iterations[index] += 1
+			pending[index] = error >= self.tolerance
+		self.iterations = iterations
+		return times
+
+	def seed_times_array(self, times):
+		'''Return the arrays of times to start a pass from, using the starting guesses for the times that do not exist'''
+		initial = self.initial_times()
+		return {name: np.where(np.isnan(times[name]), initial[name], times[name]) for name in initial}
+
+	def refinement_error_array(self, changes, steps):
+		'''Estimate the largest errors in seconds left in arrays of times after a pass (see refinement_error)'''
+		with np.errstate(divide='ignore', invalid='ignore'):
+			errors = []
+			for name, change in changes.items():
+				rate = np.where(change == 0, 0, change / steps[name])
+				errors.append(np.where(rate < 1, change * rate / (1 - rate), np.inf))
+		return np.max(errors, axis=0) * 3600
+
+	def compute_times_array(self, jdate, jummah, lat, lng, alt, timezone):
+		'''Compute prayer times as float hours for arrays of julian dates and locations'''
+		times = self.astronomy_times_array(jdate, lat, alt)
+		times = self.adjusted_times_array(times, jummah, lng, timezone)
+		return self.tuned_times_array(times)
+
+	def adjusted_times_array(self, times, jummah, lng, timezone, params = None):
+		'''Adjust a raw prayer time table to the timezone and the method settings (or params) and add midnight'''
+		params = params or self.params
+		times = self.adjust_times_array(times, jummah, lng, timezone, params)
+		# add midnight time
+		if params.midnight == 'Jafari':
+			times['midnight'] = times['sunset'] + self.time_diff_array(times['sunset'], times['fajr']) / 2
+		else:
+			times['midnight'] = times['sunset'] + self.time_diff_array(times['sunset'], times['sunrise']) / 2
+		times.update(self.night_event_times_array(times, params))
+		return times
+
+	def tuned_times_array(self, times, params = None):
+		'''Apply the offsets to an adjusted prayer time table and bring the times into 0-24 hours'''
+		times = self.tune_times_array(times, params)
+		return {name: self.fixhour_array(time) for name, time in times.items()}
+
+	def adjust_times_array(self, times, jummah, lng, timezone, params = None):
+		'''Adjust times in a prayer time table'''
+		params = params or self.params
+		tz_adjust = timezone - lng / 15.0
+		times = {name: time + tz_adjust for name, time in times.items()}
+
+		if params.high_lats != 'None':
+			times = self.adjust_high_lats_array(times, params)
+
+		if params.imsak_min:
+			times['imsak'] = times['fajr'] - params.imsak / 60.0
+		if params.maghrib_min:
+			times['maghrib'] = times['sunset'] - params.maghrib / 60.0
+		if params.isha_min:
+			times['isha'] = times['maghrib'] - params.isha / 60.0
+		times['dhuhr'] = times['dhuhr'] + params.dhuhr
+		times['dhuhr'] = np.where(jummah, times['dhuhr'] + params.jummah, times['dhuhr'])
+
+		return times
+
+	def tune_times_array(self, times, params = None):
+		'''Apply offsets to the times in a prayer time table'''
+		offset = (params or self.params).offset
+		return {name: time + offset.get(name, 0) for name, time in times.items()}
+
+	def adjust_high_lats_array(self, times, params = None):
+		'''Adjust a prayer time table for locations in higher latitudes'''
+
+		portions = (params or self.params).night_portions
+		night_time = self.time_diff_array(times['sunset'], times['sunrise'])
+		times['imsak'] = self.adjust_HL_time_array(times['imsak'], times['sunrise'], portions['imsak'] * night_time, 'ccw')
+		times['fajr']  = self.adjust_HL_time_array(times['fajr'], times['sunrise'], portions['fajr'] * night_time, 'ccw')
+		times['isha']  = self.adjust_HL_time_array(times['isha'], times['sunset'], portions['isha'] * night_time)
+		times['maghrib'] = self.adjust_HL_time_array(times['maghrib'], times['sunset'], portions['maghrib'] * night_time)
+		return times
+
+	def adjust_HL_time_array(self, time, base, portion, direction = None):
+		'''Adjust an array of times for higher latitudes by at most the given portions of the night'''
+
+		diff = self.time_diff_array(time, base) if direction == 'ccw' else self.time_diff_array(base, time)
+		with np.errstate(invalid='ignore'):
+			adjust = np.isnan(time) | (diff > portion)
+		return np.where(adjust, base + (-portion if direction == 'ccw' else portion), time)
+
+	def rise_set_angle_array(self, elevation):
+		'''Return sun angles for sunset/sunrise for an array of elevations'''
+		return 0.833 + 0.0347 * np.sqrt(elevation) # an approximation
+
+	def time_diff_array(self, time1, time2):
+		'''Compute the difference between two arrays of times'''
+		return self.fixhour_array(time2- time1)
+
+	def read_only(self, times):
+		'''Make the arrays of a prayer time table read-only so that a cached table cannot be modified'''
+		for time in times.values():
+			time.flags.writeable = False
+		return times
+
+
 	#---------------------- Misc Functions -----------------------
 
 	def time_diff(self, time1, time2):
@@ -336,15 +1140,70 @@ class PrayerTimes():
 		'''Detect if input contains min'''
 		return isinstance(arg, str) and arg.find('min') > -1
 
-	def get_qibla(self):
-		'''Get the qibla direction from current position'''
-		qaba_lat = 21.423333
-		qaba_lng = 39.823333
-
-		numerator = self.sin(qaba_lng - self.lng)
-		denominator = (self.cos(self.lat) * self.tan(qaba_lat)) - (self.sin(self.lat) * self.cos(qaba_lng - self.lng))
-
-		return round(self.arctan2(numerator, denominator))
+	def get_qibla(self, rounded = True):
+		'''Get the qibla direction from current position, in whole degrees unless rounded is False'''
+		numerator = self.sin(KAABA_LNG - self.lng)
+		denominator = (self.cos(self.lat) * self.tan(KAABA_LAT)) - (self.sin(self.lat) * self.cos(KAABA_LNG - self.lng))
+
+		qibla = self.arctan2(numerator, denominator)
+		return round(qibla) if rounded else qibla
+
+	def get_qibla_array(self, lat, lng, rounded = True):
+		'''Get the qibla directions from arrays of positions, in whole degrees unless rounded is False'''
+		lat, lng = np.asarray(lat, dtype=float), np.asarray(lng, dtype=float)
+		numerator = self.sin_array(KAABA_LNG - lng)
+		denominator = (self.cos_array(lat) * self.tan_array(KAABA_LAT)) - (self.sin_array(lat) * self.cos_array(KAABA_LNG - lng))
+
+		qibla = self.arctan2_array(numerator, denominator)
+		# Round half to even like round so that the directions match get_qibla
+		return np.round(qibla).astype(int) if rounded else qibla
+
+	def get_sun_position(self, instants):
+		'''Get the azimuths and altitudes of the sun in degrees from current position at given instants
+
+			instants are POSIX timestamps in seconds, datetime64 values or timezone-aware
+			datetimes, as a scalar or any array-like. Azimuths are clockwise from north
+			and altitudes are geometric, without refraction'''
+		azimuth, altitude = self.sun_horizon_array(self.julian_instants(instants), self.lat, self.lng)
+		return {'azimuth': azimuth, 'altitude': altitude}
+
+	def get_qibla_times(self, start, end = None):
+		'''Return the times at which the sun is aligned with the qibla from start up to (not including) end
+
+			'qibla' is when the sun is in the qibla direction and 'qibla_shadow' when it is
+			opposite so that shadows point to the qibla. The azimuths of a grid of instants
+			over every day are searched for the alignments, which are then refined. Like
+			get_times_range, each name maps to an array of float hours (NaN on days the sun is
+			not above the horizon at that alignment)'''
+		end = end or start + timedelta(1)
+		jdate, _, utc_offsets = self.range_inputs(start, end)
+		# Julian dates of the local midnights
+		midnight = jdate + self.lng / (15 * 24.0) - np.asarray(utc_offsets) / 24.0
+		hours = np.arange(0, 24 + QIBLA_GRID_STEP / 2, QIBLA_GRID_STEP)
+		# The sun positions of the grid are interpolated between the midnights, the equation of time wrapping at 24h
+		decl, eqt = (np.stack(x) for x in zip(self.sun_position_array(midnight), self.sun_position_array(midnight + 1)))
+		eqt[1] = eqt[0] + self.fix_array(eqt[1] - eqt[0] + 12, 24.0) - 12
+		portion = hours / 24.0
+		position = tuple(x[0][:, None] + (x[1] - x[0])[:, None] * portion for x in (decl, eqt))
+		azimuth, _ = self.sun_horizon_array(midnight[:, None] + portion, self.lat, self.lng, position)
+		qibla = self.get_qibla(rounded = False)
+
+		times = {}
+		for name, turn in QIBLA_TIMES.items():
+			difference = self.fix_array(azimuth - qibla - turn + 180, 360.0) - 180
+			# The alignments are the sign changes, not the jumps when the sun is on the other side
+			changes = (np.signbit(difference[:, :-1]) != np.signbit(difference[:, 1:])) & \
+					(abs(difference[:, 1:] - difference[:, :-1]) < 180)
+			day, slot = np.nonzero(changes)
+			time = self.qibla_alignment_array(midnight[day], qibla + turn, hours[slot], hours[slot + 1])
+
+			# The first alignment of every day with the sun above the horizon
+			_, altitude = self.sun_horizon_array(midnight[day] + time / 24.0, self.lat, self.lng)
+			visible = altitude > -self.rise_set_angle(self.alt)
+			first = np.full(len(jdate), np.inf)
+			np.minimum.at(first, day[visible], time[visible])
+			times[name] = np.where(np.isinf(first), np.nan, first)
+		return times
 
 
 	#----------------- Degree-Based Math Functions -------------------
@@ -368,3 +1227,40 @@ class PrayerTimes():
 			return a
 		a = a - mode * (math.floor(a / mode))
 		return a + mode if a < 0 else a
+
+
+	#-------------- Degree-Based Array Math Functions ----------------
+
+	def sin_array(self, d): return np.sin(np.radians(d))
+	def cos_array(self, d): return np.cos(np.radians(d))
+	def tan_array(self, d): return np.tan(np.radians(d))
+
+	def arcsin_array(self, x): return np.degrees(np.arcsin(x))
+	def arccos_array(self, x): return np.degrees(np.arccos(x))
+
+	def arccot_array(self, x): return np.degrees(np.arctan(1.0/x))
+	def arctan2_array(self, y, x): return np.degrees(np.arctan2(y, x))
+
+	def fixangle_array(self, angle): return self.fix_array(angle, 360.0)
+	def fixhour_array(self, hour): return self.fix_array(hour, 24.0)
+
+	def fix_array(self, a, mode):
+		a = a - mode * np.floor(a / mode)
+		return np.where(a < 0, a + mode, a)
+
+
+@lru_cache(maxsize=32)
+def _calculator(config):
+	'''Return the shared prayer times calculator of a calculation config'''
+	return PrayerTimes.from_config(config)
+
+def compute(config, date, output = "text"):
+	'''Return prayer times of a date for a calculation config
+
+		This is a pure function of its arguments so it can be called concurrently
+		from threads and processes and the config can be used as a cache key'''
+	return _calculator(config).get_times(date, output)
+
+def compute_range(config, start, end):
+	'''Return the column-oriented prayer times table of a date range for a calculation config'''
+	return _calculator(config).get_times_range(start, end)
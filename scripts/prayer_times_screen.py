@@ -4,11 +4,14 @@ from datetime import date, datetime, timedelta
 
 from kivy.app import App
 from kivy.clock import Clock
-from kivy.properties import ObjectProperty
+from kivy.properties import ListProperty, ObjectProperty
 
 from constants import MAIN_COLOR, SECONDRY_COLOR
-from custom_widgets import CustomScreen, DoubleTextButton
-from helpers import notify
+from custom_widgets import CustomModalView, CustomScreen, DoubleTextButton
+from helpers import notify, round_minute
+
+# Times that differ between the calculation methods
+COMPARED_TIMES = ("fajr", "maghrib", "isha", "midnight")
 
 
 class PrayerTimesScreen(CustomScreen):
@@ -22,7 +25,7 @@ class PrayerTimesScreen(CustomScreen):
 	def __init__(self, **kwargs):
 		super().__init__(**kwargs)
 		self.app = App.get_running_app()
-		self.prayer_times = {}
+		self.times_data = {}
 
 		self.bind(on_pre_enter=lambda _: self.create_prayers_data())
 		self.bind(on_leave=lambda _: self.destroy_prayer_data())
@@ -46,7 +49,6 @@ class PrayerTimesScreen(CustomScreen):
 		if self.app.location_data_present():
 			self.update_clock_event.cancel()
 			self.times_data = {}
-			self.prayer_times = {}
 			self.times_list.data = []
 			self.current_time.text = ""
 			self.location.text = ""
@@ -56,10 +58,12 @@ class PrayerTimesScreen(CustomScreen):
 		'''Update the prayer times'''
 
 		# Calculate today's prayer times
-		self.times_data = self.app.prayer_times.get_times(date.today())
+		times = self.app.get_prayer_times(date.today(), output="datetime")
+		self.times_data = {n: round_minute(t) if t else None for n, t in times.items()}
 
 		# Populate the lists on the dashboard
-		self.times_list.data = [{"name": n.capitalize(), "info": t} for n, t in self.times_data.items()]
+		self.times_list.data = [{"name": n.capitalize(), "info": self.app.get_formatted_time(t) if t else "----"}
+								for n, t in self.times_data.items()]
 
 		self.update_prayer_labels()
 
@@ -75,52 +79,49 @@ class PrayerTimesScreen(CustomScreen):
 		'''Change the labels reporting information about prayers'''
 
 		# Get just the current hour and minutes
-		current_time = datetime.strptime(datetime.strftime(self.app.get_current_time(), "%H:%M"), "%H:%M")
-		self.current_time.text = "Current Time: " + self.app.get_formatted_time(self.app.get_current_time())
-
-		# Measure the time remaining in all prayers
-		prayers_left = []
-		for name, prayer_time in self.times_data.items():
-			if not prayer_time == "----":
-				if self.app.prayer_times.time_format == "12h":
-					prayer_time = datetime.strptime(prayer_time, "%I:%M %p")
-				else:
-					prayer_time = datetime.strptime(prayer_time, "%H:%M ")
-
-				if prayer_time > current_time:
-					dt = prayer_time - current_time
-					dt = (datetime.min + dt).time()
-					if dt.hour == 0:
-						dt_str = dt.strftime("%M minutes remaining")
-					else:
-						dt_str = dt.strftime("%H hours & %M minutes remaining")
-					prayers_left.append((dt_str, name, prayer_time))
-					self.prayer_times[name] = dt_str
-				else:
-					dt = (current_time - prayer_time)
-					dt = (datetime.min + dt).time()
-					if dt.hour == 0:
-						dt_str = dt.strftime("Was %M minutes ago")
-					else:
-						dt_str = dt.strftime("Was %H hours & %M minutes ago")
-
-					self.prayer_times[name] = dt_str
-
-		if prayers_left:
-			time_left, next_prayer, prayer_time = min(prayers_left, key=lambda prayer: prayer[2])
-			self.prayer_time_left.text = time_left
+		current_time = self.app.get_current_time().replace(second=0, microsecond=0)
+		self.current_time.text = "Current Time: " + self.app.get_formatted_time(current_time)
+
+		# Find the next prayer, rolling over to tomorrow after the last one of today
+		next_event = self.app.prayer_times.next_event(current_time)
+		if next_event:
+			next_prayer, prayer_time, _ = next_event
+			prayer_time = round_minute(prayer_time)
+			self.prayer_time_left.text = self.time_difference_text(prayer_time, current_time)
 			# Set the next prayer text
 			self.next_prayer.text = next_prayer.capitalize() + ": " + self.app.get_formatted_time(prayer_time)
 			# Put colored focus on the next prayer time
-			self.focus_next_prayer(next_prayer.split(":")[0].capitalize())
+			self.focus_next_prayer(next_prayer.capitalize())
 		else:
 			self.prayer_time_left.text = ""
 			self.next_prayer.text = ""
 
+	def time_difference_text(self, prayer_time, current_time):
+		'''Describe the time remaining in a prayer or the time since it has passed'''
+		if prayer_time > current_time:
+			dt = (datetime.min + (prayer_time - current_time)).time()
+			if dt.hour == 0:
+				return dt.strftime("%M minutes remaining")
+			return dt.strftime("%H hours & %M minutes remaining")
+
+		dt = (datetime.min + (current_time - prayer_time)).time()
+		if dt.hour == 0:
+			return dt.strftime("Was %M minutes ago")
+		return dt.strftime("Was %H hours & %M minutes ago")
+
 	def display_notification(self, prayer):
 		'''Display the prayer toast notification'''
+		prayer_time = self.times_data.get(prayer.lower())
+		if prayer_time is not None:
+			current_time = self.app.get_current_time().replace(second=0, microsecond=0)
+			notify(title=prayer, message=self.time_difference_text(prayer_time, current_time), timeout=2)
 
-		notify(title=prayer, message=self.prayer_times[prayer.lower()], timeout=2)
+	def open_methods_comparison(self):
+		'''Open the popup comparing the times of all the calculation methods'''
+		if self.app.location_data_present():
+			MethodsComparisonPopup().open()
+		else:
+			notify(title="Location Needed", message="Location is needed to calculate the prayer times")
 
 
 class PrayerButton(DoubleTextButton):
@@ -130,3 +131,38 @@ class PrayerButton(DoubleTextButton):
 		'''Display the toast notification with the time left in the current prayer or the time past'''
 		screen = App.get_running_app().screen_manager.current_screen
 		screen.display_notification(self.name)
+
+
+class MethodsComparisonPopup(CustomModalView):
+	'''Popup to compare today's prayer times of all the calculation methods and choose one of them'''
+	data = ListProperty()
+
+	def __init__(self, **kwargs):
+		super().__init__(**kwargs)
+		self.app = App.get_running_app()
+
+		self.bind(on_pre_open=lambda _: self.create_data_list())
+
+	def create_data_list(self):
+		'''Create the list of the times of every method, highlighting the method in use'''
+		prayer_times = self.app.prayer_times
+		for method, times in prayer_times.compare_methods(date.today()).items():
+			info = "   ".join(f"{name.capitalize()} {prayer_times.get_formatted_time(times[name][0]).strip()}"
+								for name in COMPARED_TIMES)
+			background_color = SECONDRY_COLOR if method == self.app.settings["calc_method"] else MAIN_COLOR
+			self.data.append({"name": method, "info": info, "background_color": background_color})
+
+	def select_method(self, method):
+		'''Use the chosen calculation method and dismiss the popup'''
+		self.app.settings["calc_method"] = method
+		self.app.screen_manager.current_screen.update_prayer_times()
+		self.dismiss()
+
+
+class MethodTimesButton(DoubleTextButton):
+	'''Button to display the times of a calculation method and choose it upon being clicked'''
+
+	def on_press(self):
+		'''Choose the calculation method of the button'''
+		popup = self.parent.parent.parent.parent
+		popup.select_method(self.name)
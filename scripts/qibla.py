@@ -1,5 +1,7 @@
 '''Module for all code relating to the determining the qibla direction'''
 
+from datetime import date
+
 from kivy.app import App
 from kivy.properties import NumericProperty, ObjectProperty, StringProperty
 
@@ -11,6 +13,7 @@ class QiblaScreen(CustomScreen):
 	'''Class for the screen containing compass'''
 	needle_angle = NumericProperty(0)
 	location_text = StringProperty()
+	sun_text = StringProperty()
 	title = StringProperty()
 
 	def __init__(self, **kwargs):
@@ -27,6 +30,7 @@ class QiblaScreen(CustomScreen):
 		'''Remove the qibla direction'''
 		self.needle_angle = 0
 		self.location_text = ""
+		self.sun_text = ""
 
 	def set_qibla_direction(self):
 		'''Set the qibla direction from current position'''
@@ -35,5 +39,13 @@ class QiblaScreen(CustomScreen):
 			qibla_direction = self.app.prayer_times.get_qibla()
 			self.needle_angle = (360 - qibla_direction) % 360
 			self.title = f"Qibla ({self.needle_angle}°)"
+			self.set_sun_text()
 		else:
 			notify(title="Location Needed", message="Location is needed to get qibla direction")
+
+	def set_sun_text(self):
+		'''Set today's times at which the sun or the shadows point to the qibla'''
+		prayer_times = self.app.prayer_times
+		times = prayer_times.get_qibla_times(date.today())
+		sun, shadow = (prayer_times.get_formatted_time(times[name][0]) for name in ("qibla", "qibla_shadow"))
+		self.sun_text = f"Sun towards qibla: {sun}    Shadows towards qibla: {shadow}"
@@ -7,7 +7,8 @@ import constants
 from custom_widgets import (CustomModalView, CustomScreen,
 							HorizontalIconTextButton, TextButton)
 
-CALENDAR_SETTINGS_DATA = [{"text": "Hijri Adjustment", "name": "hijri_adjustment"}]
+CALENDAR_SETTINGS_DATA = [{"text": "Hijri Calendar", "name": "hijri_calendar"},
+						{"text": "Hijri Adjustment", "name": "hijri_adjustment"}]
 
 RECORD_SETTINGS_DATA = [{"text": "Fasting Record", "name": "fasting_record"},
 						{"text": "Quran Study Record", "name": "quran_record"},
@@ -0,0 +1,131 @@
+'''Module for a compact timetable of prayer times stored as minutes since midnight'''
+
+from datetime import timedelta
+
+import numpy as np
+
+# Minutes of a time that does not exist
+MISSING = 0xFFFF
+
+
+class Timetable():
+	'''Prayer times of consecutive days in a single uint16 array of minutes since midnight
+
+		The array has one row per day and one column per time name. Slicing by date and
+		exporting the buffer do not copy the minutes, so a slice of a table or a table
+		read back from bytes shares the memory of the original'''
+
+	__slots__ = ("start", "names", "columns", "minutes")
+
+	def __init__(self, start, names, minutes):
+		minutes = np.asarray(minutes)
+		if minutes.dtype != np.uint16 or minutes.shape[1:] != (len(names),):
+			raise ValueError(f"Expected uint16 minutes of shape (days, {len(names)}), got {minutes.dtype} {minutes.shape}")
+		self.start = start
+		self.names = tuple(names)
+		self.columns = {name: i for i, name in enumerate(self.names)}
+		self.minutes = minutes
+
+	@classmethod
+	def from_times(cls, start, times):
+		'''Create a timetable from a column-oriented table of float hours like the one of get_times_range'''
+		names = tuple(times)
+		hours = np.stack([times[name] for name in names], axis=-1)
+		missing = np.isnan(hours)
+		# add 0.5 minutes to round like get_formatted_time
+		hours = np.where(missing, 0, hours) + 0.5 / 60
+		hours = hours - 24 * np.floor(hours / 24)
+		whole_hours = np.floor(hours)
+		minutes = (whole_hours * 60 + np.floor((hours - whole_hours) * 60)) % 1440
+		return cls(start, names, np.where(missing, MISSING, minutes).astype(np.uint16))
+
+	@classmethod
+	def from_buffer(cls, start, names, buffer):
+		'''Create a timetable sharing the memory of a buffer exported with Timetable.buffer'''
+		return cls(start, names, np.frombuffer(buffer, dtype=np.uint16).reshape(-1, len(names)))
+
+	def buffer(self):
+		'''Return a read-only memoryview of the bytes of the minutes without copying them'''
+		minutes = np.ascontiguousarray(self.minutes).view()
+		minutes.flags.writeable = False
+		return memoryview(minutes).cast("B")
+
+	@property
+	def end(self):
+		'''The day after the last day of the timetable'''
+		return self.start + timedelta(len(self))
+
+	@property
+	def nbytes(self):
+		'''Size of the minutes in bytes'''
+		return self.minutes.nbytes
+
+	def __len__(self):
+		return len(self.minutes)
+
+	def __iter__(self):
+		for i in range(len(self)):
+			yield TimetableRow(self.start + timedelta(i), self.columns, self.minutes[i])
+
+	def __getitem__(self, key):
+		'''Return the row of a date or a timetable of a slice of dates, without a step'''
+		if isinstance(key, slice):
+			if key.step is not None:
+				raise ValueError("Timetables can only be sliced without a step")
+			start = self.index(key.start) if key.start is not None else 0
+			stop = self.index(key.stop) if key.stop is not None else len(self)
+			start = min(max(start, 0), len(self))
+			stop = min(max(stop, start), len(self))
+			return Timetable(self.start + timedelta(start), self.names, self.minutes[start:stop])
+
+		i = self.index(key)
+		if not 0 <= i < len(self):
+			raise KeyError(key)
+		return TimetableRow(key, self.columns, self.minutes[i])
+
+	def index(self, day):
+		'''Return the position of a date in the timetable'''
+		return day.toordinal() - self.start.toordinal()
+
+	def column(self, name):
+		'''Return the minutes of a time on every day as a uint16 array view'''
+		return self.minutes[:, self.columns[name]]
+
+	def formatted(self, prayer_times):
+		'''Return the times formatted in the time format of a prayer times calculator, one array per time name'''
+		table = prayer_times.format_table(prayer_times.time_suffixes)
+		# The entry after the last minute of the day is the missing time
+		return {name: table[np.minimum(self.column(name), 1440)] for name in self.names}
+
+
+class TimetableRow():
+	'''View of the times of a day of a timetable, as minutes since midnight or None'''
+
+	__slots__ = ("date", "columns", "minutes")
+
+	def __init__(self, date, columns, minutes):
+		self.date = date
+		self.columns = columns
+		self.minutes = minutes
+
+	def __getitem__(self, name):
+		minute = int(self.minutes[self.columns[name]])
+		return None if minute == MISSING else minute
+
+	def __getattr__(self, name):
+		if name in TimetableRow.__slots__:
+			raise AttributeError(name)
+		try:
+			return self[name]
+		except KeyError:
+			raise AttributeError(name) from None
+
+	def __iter__(self):
+		return iter(self.columns)
+
+	def __repr__(self):
+		return f"TimetableRow({self.date}, {dict(self.items())})"
+
+	def items(self):
+		'''Return the (name, minutes) pairs of the day'''
+		return [(name, self[name]) for name in self.columns]
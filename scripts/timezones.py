@@ -0,0 +1,58 @@
+'''Module for looking up the UTC offsets of timezones on any date'''
+
+from bisect import bisect_right
+from datetime import date, datetime
+from functools import lru_cache
+
+import numpy as np
+from pytz import timezone
+
+# Proleptic gregorian ordinal of the unix epoch
+EPOCH_ORDINAL = date(1970, 1, 1).toordinal()
+
+
+class TimezoneTable():
+	'''UTC transition instants of a timezone with the offsets in effect after each of them
+
+		The transitions are read from pytz once, after which the offset on any date
+		or instant is a binary search'''
+
+	def __init__(self, name):
+		self.name = name
+		tz = timezone(name)
+		transitions = getattr(tz, "_utc_transition_times", None)
+		if transitions:
+			# The first transition is a datetime(1, 1, 1) sentinel which stays before every date
+			self.transitions = [(t - datetime(1970, 1, 1)).total_seconds() for t in transitions]
+			self.offsets = [info[0].total_seconds() / 3600 for info in tz._transition_info]
+		else:
+			self.transitions = [float("-inf")]
+			self.offsets = [tz.utcoffset(datetime(2000, 1, 1)).total_seconds() / 3600]
+		self.transitions_array = np.array(self.transitions)
+		self.offsets_array = np.array(self.offsets)
+
+	def utcoffset_at(self, timestamp):
+		'''Return the UTC offset in hours at a unix timestamp'''
+		return self.offsets[bisect_right(self.transitions, timestamp) - 1]
+
+	def utcoffset(self, day):
+		'''Return the UTC offset in hours in effect on a date, taken at noon UTC'''
+		return self.utcoffset_at(((day.toordinal() - EPOCH_ORDINAL) * 24 + 12) * 3600)
+
+	def utcoffsets(self, ordinals):
+		'''Return the UTC offsets in hours in effect on an array of date ordinals'''
+		timestamps = ((np.asarray(ordinals) - EPOCH_ORDINAL) * 24 + 12) * 3600.0
+		return self.offsets_array[np.searchsorted(self.transitions_array, timestamps, side="right") - 1]
+
+
+@lru_cache(maxsize=None)
+def get_timezone_table(name):
+	'''Return the shared transition table of a timezone name'''
+	return TimezoneTable(name)
+
+def utcoffsets(names, day):
+	'''Return the UTC offsets in hours on a date for an array of timezone names'''
+	names = np.asarray(names)
+	unique_names, inverse = np.unique(names, return_inverse=True)
+	offsets = np.array([get_timezone_table(name).utcoffset(day) for name in unique_names])
+	return offsets[inverse].reshape(names.shape)